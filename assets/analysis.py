@@ -0,0 +1,992 @@
+"""
+Text analysis pipeline: PDF extraction, word counting and difficult word classification.
+
+This module must not import Kivy. It is imported by worker processes, which
+would otherwise open a window each, and by anything that runs without the UI.
+"""
+import fitz 
+import numpy as np
+import re
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+
+from collections import Counter
+import nltk
+from nltk.corpus import wordnet 
+from assets.candidates import Candidates, load_candidates
+from assets.common_words import open_common_words
+from assets.definition_cache import DefinitionCache
+from assets.frequency_index import get_global_frequency_index
+from assets.instrumentation import resolve as resolve_instrumentation
+from assets.library import Library
+from assets.mapped_index import write_index
+from assets.page_cache import PageCountCache, page_hash, pdf_file_key
+from assets.tokenizers import DEFAULT_TOKENIZER, get_tokenizer, tokenizer_name
+from assets.vocabulary import Vocabulary, WordFrequencies
+from assets.wordnet_index import get_wordnet_index
+
+
+# Below this many pages the cost of starting worker processes outweighs the gain
+PARALLEL_MIN_PAGES = 32
+# Pages handed to a worker at a time; with a bounded number of shards in flight
+# this caps how much page text is held in memory during parallel counting
+PARALLEL_SHARD_PAGES = 8
+
+# Extracting in worker processes only pays off for longer documents
+PARALLEL_EXTRACT_MIN_PAGES = 64
+# Contiguous pages a worker extracts at a time
+EXTRACT_RANGE_PAGES = 16
+# Page counts written to or read from the page cache at a time
+PAGE_CACHE_STORE_PAGES = 64
+
+_NON_ALPHA = re.compile(r'[^A-Za-z]+')
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+
+PROFICIENCY_SETTINGS = {
+    "Low": {"local_limit": 70, "global_freq_limit": 1e-5, "common_word_lower_limit": 100},
+    "Medium": {"local_limit": 45, "global_freq_limit": 1e-6, "common_word_lower_limit": 75},
+    "High": {"local_limit": 30, "global_freq_limit": 1e-7, "common_word_lower_limit": 40}
+}
+
+
+class AnalysisCancelled(Exception):
+    """Raised inside a running analysis when the user cancels it."""
+
+
+def check_cancelled(cancel_event):
+    """Raises AnalysisCancelled if the given threading.Event has been set."""
+    if cancel_event is not None and cancel_event.is_set():
+        raise AnalysisCancelled()
+
+
+def report_progress(progress, message):
+    """Sends a progress message to the callback, if one was given."""
+    if progress is not None:
+        progress(message)
+
+
+def proficiency_settings(proficiency_level):
+    """Classification thresholds for a proficiency level; unknown levels get Medium."""
+    return PROFICIENCY_SETTINGS.get(proficiency_level, PROFICIENCY_SETTINGS["Medium"])
+
+
+def split_workers(workers):
+    """
+    Splits a worker budget between extraction and counting, which run at the same
+    time while a PDF is analyzed. Counting usually costs more than extracting, so
+    extraction gets a third of the budget, and only once that is at least two
+    workers; below that the pages are extracted in this process.
+
+    Returns:
+        tuple: (extraction workers, counting workers), at most `workers` processes together.
+    """
+    extract_workers = workers // 3
+    if extract_workers < 2:
+        return 1, workers
+    return extract_workers, workers - extract_workers
+
+
+def worker_pool(workers, initializer=None, initargs=()):
+    """
+    Process pool whose workers search the same NLTK data directories as this process.
+    Spawned workers (Windows, macOS) start with NLTK's default data path, which does
+    not include the bundled assets/nltk_data, so word_tokenize would fail in them.
+    """
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                               initargs=(list(nltk.data.path), initializer, initargs))
+
+
+def _init_worker(nltk_paths, initializer, initargs):
+    for path in reversed(nltk_paths):
+        if path not in nltk.data.path:
+            nltk.data.path.insert(0, path)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def iter_pdf_pages(file_path, cancel_event=None, instrumentation=None, workers=1):
+    """
+    Yields the text of each PDF page, extracting one page at a time.
+
+    Args:
+        file_path (str): Path to the PDF.
+        cancel_event (threading.Event, optional): Stops extraction when set.
+        instrumentation (Instrumentation, optional): Times the extraction ("extract").
+        workers (int): Number of worker processes. With more than one worker, documents
+            of at least PARALLEL_EXTRACT_MIN_PAGES pages are extracted in contiguous page
+            ranges by workers that each open the file themselves; pages are still
+            yielded in order.
+
+    Yields:
+        str: Text of the next page.
+    """
+    instrumentation = resolve_instrumentation(instrumentation)
+    doc = fitz.open(file_path)
+    if workers > 1 and doc.page_count >= PARALLEL_EXTRACT_MIN_PAGES:
+        page_count = doc.page_count
+        doc.close()
+        yield from _iter_pdf_pages_parallel(file_path, page_count, workers, cancel_event, instrumentation)
+        return
+    try:
+        for page in doc:
+            check_cancelled(cancel_event)
+            with instrumentation.stage("extract"):
+                text = page.get_text()
+            instrumentation.count("pages")
+            yield text
+    finally:
+        doc.close()
+
+
+_worker_doc = None
+
+
+def _init_extract_worker(file_path):
+    # Each worker opens its own handle once and keeps it for all its page ranges
+    global _worker_doc
+    _worker_doc = fitz.open(file_path)
+
+
+def _extract_page_range(start, stop):
+    # Runs in a worker process
+    return [_worker_doc[number].get_text() for number in range(start, stop)]
+
+
+def _iter_pdf_pages_parallel(file_path, page_count, workers, cancel_event, instrumentation):
+    pending = deque()
+
+    with worker_pool(workers, _init_extract_worker, (file_path,)) as executor:
+
+        def take_oldest():
+            # "extract" is the time spent waiting for the workers
+            with instrumentation.stage("extract"):
+                texts = pending.popleft().result()
+            instrumentation.count("pages", len(texts))
+            return texts
+
+        try:
+            for start in range(0, page_count, EXTRACT_RANGE_PAGES):
+                check_cancelled(cancel_event)
+                stop = min(start + EXTRACT_RANGE_PAGES, page_count)
+                pending.append(executor.submit(_extract_page_range, start, stop))
+                # A bounded number of ranges in flight keeps memory flat
+                if len(pending) > workers * 2:
+                    yield from take_oldest()
+            while pending:
+                check_cancelled(cancel_event)
+                yield from take_oldest()
+        except BaseException:
+            # Also reached when the consumer stops iterating early. Only the ranges
+            # already being extracted are waited for; after shutdown(wait=False)
+            # the with block could no longer join the workers.
+            executor.shutdown(cancel_futures=True)
+            raise
+
+
+class PdfPages:
+    """
+    Pages of a PDF that are extracted lazily while being iterated.
+    Only the page count is read up front, so memory does not grow with the book
+    and counting can start as soon as the first page is extracted.
+    """
+
+    def __init__(self, file_path, cancel_event=None, instrumentation=None, workers=1):
+        self.file_path = file_path
+        self.cancel_event = cancel_event
+        self.instrumentation = instrumentation
+        self.workers = workers
+        with fitz.open(file_path) as doc:
+            self.page_count = doc.page_count
+
+    def __len__(self):
+        return self.page_count
+
+    def __iter__(self):
+        return iter_pdf_pages(self.file_path, self.cancel_event, self.instrumentation, self.workers)
+
+
+def extract_pdf_pages(file_path, progress=None, cancel_event=None, workers=1):
+    """
+    Extracts text page-by-page from a PDF file.
+
+    Args:
+        file_path (str): Path to the PDF.
+        progress (callable, optional): Called with a status message after each page.
+        cancel_event (threading.Event, optional): Stops extraction when set.
+        workers (int): Worker processes for long documents, see iter_pdf_pages.
+
+    Returns:
+        list: A list of strings, one per PDF page.
+    """
+    try:
+        pages = []
+        for page in iter_pdf_pages(file_path, cancel_event, workers=workers):
+            pages.append(page)
+            report_progress(progress, f"Extracting text: page {len(pages)}")
+        return pages
+    except AnalysisCancelled:
+        raise
+    except Exception as e:
+        print(f"Error reading PDF: {e}")
+        return []
+
+def clean_text(text):
+    """
+    Cleans the text by removing punctuation and converting to lowercase.
+    This helps with word matching.
+
+    Args:
+        text (str): The text to clean.
+
+    Returns:
+        str: The cleaned text.
+    """
+    if text.isdigit() or len(text)<2:
+        return None  # Skip pure numbers
+        
+    text = re.sub(r"'s$", '', text)  # Remove trailing possessive
+    text = re.sub(r'[^\w\s]', '', text)  # Remove punctuation
+    text = re.sub(r'[^A-Za-z]', '', text)  # Remove non-alphabetic characters
+
+    cleaned = text.lower()
+    return cleaned if cleaned else None
+
+@lru_cache(maxsize=1 << 16)
+def normalize_token(text):
+    """
+    Fast equivalent of clean_text for the counting loop.
+    Uses one precompiled pattern (and none at all for plain ASCII words) and
+    caches the result per raw token, since a book repeats most of its tokens.
+
+    Args:
+        text (str): The raw token.
+
+    Returns:
+        str: The cleaned token, or None if nothing is left.
+    """
+    if len(text) < 2 or text.isdigit():
+        return None
+    if text.endswith("'s"):
+        text = text[:-2]
+    elif text.endswith("'s\n"):
+        text = text[:-3]  # clean_text's "'s$" also matches before a final newline
+    if text.isascii() and text.isalpha():
+        cleaned = text.lower()
+    else:
+        cleaned = _NON_ALPHA.sub('', text).lower()
+    return cleaned or None
+
+@lru_cache(maxsize=1 << 16)
+def lemmatize(word):
+    """
+    Base form of a cleaned word as WordNet sees it ("obfuscated" → "obfuscate"),
+    the same form get_word_definition takes its definition from.
+    Words WordNet does not know are their own lemma. Memoized per surface form.
+    """
+    wordnet_index = get_wordnet_index()
+    if wordnet_index is not None:
+        lemma = wordnet_index.lemma(word)
+    else:
+        lemma = wordnet.morphy(word)
+    return lemma or word
+
+
+def group_word_forms(word_frequency, common_words=frozenset()):
+    """
+    Folds inflected forms into one entry per lemma with their combined local frequency,
+    so each lemma is classified and looked up once.
+    Lemmas that are common words are dropped, like their forms would have been.
+
+    Args:
+        word_frequency (Mapping): Counts of the cleaned words.
+        common_words (set): Words to skip.
+
+    Returns:
+        WordFrequencies: lemma → combined count, in order of each lemma's first form.
+    """
+    return WordFrequencies.from_items(((lemmatize(word), count) for word, count in word_frequency.items()),
+                                      skip=common_words)
+
+
+def get_word_definition(word, definition_cache):
+    """
+    Caching and retrieving word definitions from WordNet.
+    Uses the precomputed definition index when it has been built, so the
+    WordNet corpus reader is only loaded as a fallback.
+    """
+    if word in definition_cache:
+        return definition_cache[word]
+
+    wordnet_index = get_wordnet_index()
+    if wordnet_index is not None:
+        definition = wordnet_index.definition(word)
+        definition_cache[word] = definition
+        return definition
+    
+    synsets = wordnet.synsets(word)
+    if synsets:
+        definition = synsets[0].definition()
+        definition_cache[word] = definition
+        return definition
+    else:
+        definition_cache[word] = None
+        return None
+
+def append_to_common_words_batch(words, file_path):
+    """
+    Appends a batch of words to the common words file.
+    Words already in the file are skipped, and concurrent writers are serialized.
+
+    Args:
+        words (list): List of words to append.
+        file_path (str): Path to the file where words will be appended.
+
+    Returns:
+        int: Number of words actually appended.
+    """
+
+    try:
+        return open_common_words(file_path).add(words)
+    except Exception as e:
+        print(f"Error writing to file: {e}")
+        return 0
+
+
+def count_difficult_words(pages, common_words, tokenizer=DEFAULT_TOKENIZER, word_frequency=None):
+    """
+    Counts cleaned words not in common_words over a sequence of pages.
+    Also used as the worker entry point for parallel counting.
+
+    Args:
+        word_frequency (WordFrequencies, optional): Add the counts to these instead of new ones.
+
+    Returns:
+        tuple: (WordFrequencies, number of raw tokens seen)
+    """
+    tokenize = get_tokenizer(tokenizer)
+    if word_frequency is None:
+        word_frequency = new_word_frequencies(common_words)
+    tokens_seen = 0
+    for page in pages:
+        words = tokenize(page)
+        word_frequency.add_tokens(words)
+        tokens_seen += len(words)
+    return word_frequency, tokens_seen
+
+
+def new_word_frequencies(common_words):
+    """Empty counts over a vocabulary that cleans raw tokens and skips common words."""
+    return WordFrequencies(Vocabulary(normalize_token, skip=common_words))
+
+
+def count_page_tokens(page, tokenizer=DEFAULT_TOKENIZER):
+    """
+    Counts every cleaned word on one page, common words included.
+    This is what the page cache stores; common words are removed when merging.
+
+    Returns:
+        tuple: (Counter of words, number of raw tokens)
+    """
+    page_frequency = Counter()
+    words = get_tokenizer(tokenizer)(page)
+    for raw_word in words:
+        cleaned_word = normalize_token(raw_word)
+        if cleaned_word:
+            page_frequency[cleaned_word] += 1
+    return page_frequency, len(words)
+
+
+def _count_page_batch(pages, tokenizer):
+    # Runs in a worker process when counting with the page cache
+    return [count_page_tokens(page, tokenizer) for page in pages]
+
+
+def _merge_page_counts(word_frequency, page_frequency):
+    # Common words are skipped by the vocabulary of word_frequency
+    word_frequency.add_counts(page_frequency.keys(), page_frequency.values())
+
+
+_worker_common_words = frozenset()
+_worker_tokenizer = DEFAULT_TOKENIZER
+
+
+def _count_shard(shard):
+    # Runs in a worker process; common words were handed over once by the initializer.
+    # Only the words and their counts go back, not the worker's token table.
+    shard_frequency, shard_tokens = count_difficult_words(shard, _worker_common_words, _worker_tokenizer)
+    return shard_frequency.words, shard_frequency.counts, shard_tokens
+
+
+def _init_count_worker(common_words, tokenizer):
+    global _worker_common_words, _worker_tokenizer
+    _worker_common_words = common_words
+    _worker_tokenizer = tokenizer
+
+
+def get_difficult_word_frequencies(pages, common_words, progress=None, cancel_event=None, workers=1,
+                                   page_cache=None, book_key=None, instrumentation=None, tokenizer=None):
+    """
+    Given the extracted pages, counts the frequency of difficult words not in the common_words list.
+    Pages are consumed one at a time, so a lazy source such as PdfPages is never held in memory.
+
+    Args:
+        pages (iterable): Text of each page, e.g. a list or a PdfPages.
+        common_words (set): Words to skip.
+        progress (callable, optional): Called with a status message as pages are counted.
+        cancel_event (threading.Event, optional): Stops counting when set.
+        workers (int): Number of worker processes. With more than one worker the pages
+            are split into contiguous shards counted in parallel; the result is identical
+            to the serial path.
+        page_cache (PageCountCache, optional): Reuses the counts of pages seen before,
+            so only new or changed pages are tokenized.
+        book_key (str, optional): pdf_file_key of the source file. If all of its pages
+            are cached, the pages are not read at all.
+        instrumentation (Instrumentation, optional): Counts tokens and page cache hits;
+            in serial mode also times tokenizing ("tokenize").
+        tokenizer (str, optional): Tokenizer backend, see assets.tokenizers. Defaults to
+            the WORD_SEARCH_TOKENIZER environment variable, else nltk.
+
+    Returns:
+        tuple: (WordFrequencies, its words as a keys view). The counts live in an array
+            indexed by word ID, and the words are in order of first appearance.
+    """
+    instrumentation = resolve_instrumentation(instrumentation)
+    tokenizer = tokenizer_name(tokenizer)
+    total = len(pages) if hasattr(pages, "__len__") else None
+    if page_cache is not None:
+        word_frequency = _count_pages_cached(pages, common_words, workers, total, progress,
+                                             cancel_event, page_cache, book_key, instrumentation, tokenizer)
+    elif workers > 1 and (total is None or total >= PARALLEL_MIN_PAGES):
+        word_frequency = _count_pages_parallel(pages, common_words, workers, total, progress,
+                                               cancel_event, instrumentation, tokenizer)
+    else:
+        word_frequency = new_word_frequencies(common_words)
+        tokens_seen = 0
+        for index, page in enumerate(pages, start=1):
+            check_cancelled(cancel_event)
+            with instrumentation.stage("tokenize"):
+                _, page_tokens = count_difficult_words((page,), common_words, tokenizer, word_frequency)
+            tokens_seen += page_tokens
+            _report_counting(progress, index, total, tokens_seen)
+        instrumentation.count("tokens", tokens_seen)
+
+    instrumentation.count("distinct_words", len(word_frequency))
+    return word_frequency, word_frequency.keys()
+
+
+def _report_counting(progress, pages_done, total, tokens_seen, reused=0):
+    of_total = f"/{total}" if total is not None else ""
+    unchanged = f", {reused} pages unchanged" if reused else ""
+    report_progress(progress, f"Counting tokens: page {pages_done}{of_total} ({tokens_seen} tokens{unchanged})")
+
+
+def _count_pages_parallel(pages, common_words, workers, total, progress, cancel_event, instrumentation,
+                          tokenizer):
+    word_frequency = new_word_frequencies(common_words)
+    pages_done = 0
+    tokens_seen = 0
+    pending = deque()
+
+    with worker_pool(workers, _init_count_worker, (common_words, tokenizer)) as executor:
+
+        def merge_oldest():
+            # Shards are merged in page order so word order matches the serial path
+            nonlocal pages_done, tokens_seen
+            future, shard_len = pending.popleft()
+            shard_words, shard_counts, shard_tokens = future.result()
+            word_frequency.add_counts(shard_words, shard_counts)
+            pages_done += shard_len
+            tokens_seen += shard_tokens
+            _report_counting(progress, pages_done, total, tokens_seen)
+
+        try:
+            page_iter = iter(pages)
+            while True:
+                check_cancelled(cancel_event)
+                # Extraction of the next shard overlaps with workers counting earlier ones
+                shard = list(islice(page_iter, PARALLEL_SHARD_PAGES))
+                if not shard:
+                    break
+                pending.append((executor.submit(_count_shard, shard), len(shard)))
+                if len(pending) > workers * 2:
+                    merge_oldest()
+            while pending:
+                check_cancelled(cancel_event)
+                merge_oldest()
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    instrumentation.count("tokens", tokens_seen)
+    return word_frequency
+
+
+def _count_pages_cached(pages, common_words, workers, total, progress, cancel_event, page_cache, book_key,
+                        instrumentation, tokenizer):
+    word_frequency = new_word_frequencies(common_words)
+    if book_key:
+        # Each tokenizer keeps its own list of page hashes for the file
+        book_key = f"{book_key}|{tokenizer}"
+
+    with instrumentation.stage("page_cache"):
+        known_pages = page_cache.book_pages(book_key) if book_key else None
+    if known_pages is not None:
+        # Same file as last time: merge the stored counts without extracting any text
+        reused = _merge_known_pages(word_frequency, known_pages, page_cache, cancel_event, instrumentation)
+        if reused is not None:
+            report_progress(progress, f"Reused word counts of all {len(known_pages)} pages")
+            return reused
+        # Some pages were pruned meanwhile; count the file again
+        word_frequency = new_word_frequencies(common_words)
+
+    # Same shape as _count_pages_parallel, except that shards only send their
+    # uncached pages to the workers; serially every page is its own shard.
+    # Counted pages are stored every PAGE_CACHE_STORE_PAGES pages, so only the
+    # shards in flight and the unsaved pages are held in memory.
+    parallel = workers > 1 and (total is None or total >= PARALLEL_MIN_PAGES)
+    shard_size = PARALLEL_SHARD_PAGES if parallel else 1
+    max_pending = workers * 2 if parallel else 0
+    executor = worker_pool(workers) if parallel else None
+    page_hashes = []
+    in_flight = set()  # pages sent to be counted, not merged yet
+    unsaved = {}
+    pending = deque()
+    pages_done = 0
+    tokens_seen = 0
+    reused = 0
+
+    def save():
+        with instrumentation.stage("page_cache"):
+            page_cache.store(unsaved)
+        unsaved.clear()
+
+    def merge_oldest():
+        nonlocal pages_done, tokens_seen
+        keys, counts, submitted, job = pending.popleft()
+        if job is not None:
+            for i, page_counts in zip(submitted, job.result() if executor is not None else job):
+                counts[i] = unsaved[keys[i]] = page_counts
+                in_flight.discard(keys[i])
+        repeated = [key for key, page_counts in zip(keys, counts) if page_counts is None]
+        if repeated:
+            # Pages already in flight when this shard was read; an earlier shard
+            # has counted them since
+            with instrumentation.stage("page_cache"):
+                found = page_cache.get_many(key for key in repeated if key not in unsaved)
+            counts = [page_counts or unsaved.get(key) or found[key] for key, page_counts in zip(keys, counts)]
+        for page_frequency, page_tokens in counts:
+            _merge_page_counts(word_frequency, page_frequency)
+            tokens_seen += page_tokens
+        pages_done += len(keys)
+        _report_counting(progress, pages_done, total, tokens_seen, reused)
+        if len(unsaved) >= PAGE_CACHE_STORE_PAGES:
+            save()
+
+    try:
+        page_iter = iter(pages)
+        while True:
+            check_cancelled(cancel_event)
+            shard = list(islice(page_iter, shard_size))
+            if not shard:
+                break
+            with instrumentation.stage("page_cache"):
+                keys = [page_hash(page, tokenizer) for page in shard]
+                found = page_cache.get_many(key for key in keys if key not in unsaved and key not in in_flight)
+            page_hashes.extend(keys)
+            counts = [unsaved.get(key) or found.get(key) for key in keys]
+            submitted = []
+            for i, (key, page_counts) in enumerate(zip(keys, counts)):
+                if page_counts is None and key not in in_flight:
+                    in_flight.add(key)
+                    submitted.append(i)
+            reused += len(shard) - len(submitted)
+            job = None
+            if submitted:
+                uncounted = [shard[i] for i in submitted]
+                if executor is not None:
+                    job = executor.submit(_count_page_batch, uncounted, tokenizer)
+                else:
+                    with instrumentation.stage("tokenize"):
+                        job = _count_page_batch(uncounted, tokenizer)
+            pending.append((keys, counts, submitted, job))
+            if len(pending) > max_pending:
+                merge_oldest()
+        while pending:
+            check_cancelled(cancel_event)
+            merge_oldest()
+    except BaseException:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        # Pages counted so far are kept even if the analysis was cancelled
+        save()
+        if executor is not None:
+            executor.shutdown()
+
+    if book_key:
+        with instrumentation.stage("page_cache"):
+            page_cache.store_book(book_key, page_hashes)
+            page_cache.prune()
+    instrumentation.count("page_cache_hits", reused)
+    instrumentation.count("page_cache_misses", pages_done - reused)
+    instrumentation.count("tokens", tokens_seen)
+    return word_frequency
+
+
+def _merge_known_pages(word_frequency, known_pages, page_cache, cancel_event, instrumentation):
+    """
+    Merges the stored counts of a file's pages, a chunk at a time.
+    Returns None if one of the pages is no longer in the cache.
+    """
+    tokens = 0
+    for start in range(0, len(known_pages), PAGE_CACHE_STORE_PAGES):
+        check_cancelled(cancel_event)
+        chunk = known_pages[start:start + PAGE_CACHE_STORE_PAGES]
+        with instrumentation.stage("page_cache"):
+            cached = page_cache.get_many(chunk)
+        if len(cached) < len(set(chunk)):
+            return None
+        for key in chunk:
+            page_frequency, page_tokens = cached[key]
+            _merge_page_counts(word_frequency, page_frequency)
+            tokens += page_tokens
+    instrumentation.count("page_cache_hits", len(known_pages))
+    instrumentation.count("tokens", tokens)
+    return word_frequency
+
+
+def identify_difficult_words(cleaned_words,word_frequency_dict, local_limit, 
+                             global_freq_limit, common_word_lower_limit,common_words_file_path,
+                             progress=None, cancel_event=None, definition_cache_path=None,
+                             common_words_store=None, instrumentation=None):
+
+    """
+    Identifies difficult words using both local and global frequency.
+    Appends globally common words to a combined common words file.
+
+    If definition_cache_path is given, definitions are prefetched from and saved
+    to that persistent cache, so words seen in earlier books skip WordNet.
+    New common words are added through common_words_store if given (the store
+    the words were counted against), otherwise to common_words_file_path.
+    With instrumentation, the frequency lookup, the definition cache, the
+    definition loop and the common words update are timed separately.
+
+    Returns:
+        tuple: ({word: definition}, number of words added to the common words)
+    """
+    instrumentation = resolve_instrumentation(instrumentation)
+    settings = {"local_limit": local_limit, "global_freq_limit": global_freq_limit,
+                "common_word_lower_limit": common_word_lower_limit}
+    candidates = collect_candidates(None, cleaned_words, word_frequency_dict, [settings],
+                                    definition_cache_path, progress, cancel_event, instrumentation)
+    difficult_words, new_common_words = apply_level(candidates, settings, instrumentation=instrumentation)
+    new_common_words_len = _add_common_words(new_common_words, common_words_store, common_words_file_path,
+                                             instrumentation)
+    return difficult_words, new_common_words_len
+
+
+def collect_candidates(book_name, cleaned_words, word_frequency, levels, definition_cache_path=None,
+                       progress=None, cancel_event=None, instrumentation=None):
+    """
+    Computes what classifying a book at any of the given levels needs, once: the
+    local and global frequency of every word, and the definition of every word that
+    at least one of the levels accepts.
+
+    Args:
+        book_name (str): Stored with the candidates.
+        cleaned_words (iterable): The counted words.
+        word_frequency (Mapping): Local count of each word, e.g. the WordFrequencies
+            from get_difficult_word_frequencies.
+        levels (list): Proficiency settings the definitions are resolved for.
+        definition_cache_path (str, optional): sqlite file of the persistent definition cache.
+
+    Returns:
+        Candidates
+    """
+    instrumentation = resolve_instrumentation(instrumentation)
+    frequencies = _word_frequencies_of(cleaned_words, word_frequency)
+    words = list(frequencies.words)
+    with instrumentation.stage("global_frequency"):
+        # Local and global frequencies are arrays parallel to the words, so
+        # thresholds are applied to all words at once
+        candidates = Candidates(book_name, words, frequencies.counts.copy(),
+                                get_global_frequency_index().frequency_array(words))
+        needed = candidates.accepted_by_any(levels)
+    candidates.definitions = _resolve_definitions([words[i] for i in needed.tolist()], definition_cache_path,
+                                                  progress, cancel_event, instrumentation)
+    return candidates
+
+
+def apply_level(candidates, settings, definition_cache_path=None, progress=None, cancel_event=None,
+                instrumentation=None):
+    """
+    Classifies the candidates with one proficiency setting (a preset or custom values).
+    Accepted words whose definition was not resolved yet are looked up and added
+    to candidates.definitions.
+
+    Returns:
+        tuple: ({word: definition} of the difficult words, list of words to add to the common words)
+    """
+    instrumentation = resolve_instrumentation(instrumentation)
+    with instrumentation.stage("classify"):
+        accepted, common = candidates.classify(settings["local_limit"], settings["global_freq_limit"],
+                                               settings["common_word_lower_limit"])
+        failed_local = candidates.local_freq > settings["local_limit"]
+        globally_rare = failed_local & (candidates.global_freq < settings["global_freq_limit"])
+    instrumentation.count("failed_local", int(np.count_nonzero(failed_local)))
+    instrumentation.count("globally_rare", int(np.count_nonzero(globally_rare)))
+
+    words = candidates.words
+    accepted_words = [words[i] for i in accepted.tolist()]
+    unresolved = [word for word in accepted_words if word not in candidates.definitions]
+    if unresolved:
+        candidates.definitions.update(_resolve_definitions(unresolved, definition_cache_path, progress,
+                                                           cancel_event, instrumentation))
+    definitions = candidates.definitions
+    difficult_words = {word: definitions[word] for word in accepted_words if definitions[word]}
+    instrumentation.count("difficult_words", len(difficult_words))
+    return difficult_words, [words[i] for i in common.tolist()]
+
+
+def _resolve_definitions(words, definition_cache_path, progress, cancel_event, instrumentation):
+    """
+    Looks up the definitions of the words, through the persistent cache if given.
+
+    Returns:
+        dict: {word: definition or None}
+    """
+    definition_cache = {}
+    persistent_cache = None
+    if definition_cache_path:
+        with instrumentation.stage("definition_cache"):
+            persistent_cache = DefinitionCache(definition_cache_path)
+            definition_cache = persistent_cache.prefetch(words)
+    prefetched = set(definition_cache)
+    definitions_start = time.perf_counter()
+    total = len(words)
+
+    try:
+        for index, word in enumerate(words, start=1):
+            if index % 200 == 0 or index == total:
+                check_cancelled(cancel_event)
+                report_progress(progress, f"Resolving definitions: {index}/{total} words")
+            get_word_definition(word, definition_cache)
+    finally:
+        instrumentation.add_time("definitions", time.perf_counter() - definitions_start)
+        # Definitions resolved so far are kept even if the analysis was cancelled
+        if persistent_cache is not None:
+            with instrumentation.stage("definition_cache"):
+                persistent_cache.store({word: definition for word, definition in definition_cache.items()
+                                        if word not in prefetched})
+                persistent_cache.close()
+
+    # Definitions not found in the persistent cache were looked up in the WordNet index,
+    # or in the WordNet corpus reader when the index has not been built
+    lookups = "wordnet_index_lookups" if get_wordnet_index() is not None else "wordnet_synset_lookups"
+    instrumentation.count("definition_cache_hits", len(prefetched))
+    instrumentation.count(lookups, len(definition_cache) - len(prefetched))
+    return definition_cache
+
+
+def _add_common_words(new_common_words, common_words_store, common_words_file_path, instrumentation):
+    # After processing all words, append all common words to the common words file at once
+    new_common_words_len = 0
+    if new_common_words:
+        with instrumentation.stage("append_common_words"):
+            if common_words_store is not None:
+                new_common_words_len = common_words_store.add(new_common_words)
+            else:
+                new_common_words_len = append_to_common_words_batch(new_common_words, common_words_file_path)
+    instrumentation.count("common_words_appended", new_common_words_len)
+    return new_common_words_len
+
+
+def _word_frequencies_of(cleaned_words, word_frequency):
+    # The counting result is used as is; other mappings (e.g. a Counter) are
+    # converted, keeping only the given words
+    if isinstance(word_frequency, WordFrequencies) and len(cleaned_words) == len(word_frequency):
+        return word_frequency
+    return WordFrequencies.from_items((word, word_frequency.get(word, 0)) for word in cleaned_words)
+
+
+def load_common_words(filepath):
+    """Loads common words from a file into a set.
+
+       Args:
+          filepath (str): Path to the common words file.
+
+       Returns:
+          set: A set of common words.
+    """
+    common_words = set()
+    try:
+        with open(filepath, 'r') as f:
+            for line in f:
+                common_words.add(line.strip())
+    except FileNotFoundError:
+        print(f"Common words file not found at {filepath}. Using a small default list.")
+        #  A very small default list if the file isn't found. For testing.
+        common_words = {"the", "and", "is", "of", "a", "an", "in", "to", "it", 
+                        "that", "was", "he", "she", "for", "on", "are", "with", "as", "I",
+                          "his", "they", "at", "be", "this", "have", "from", "or", "had", "but", "not"}
+    except Exception as e:
+        print(f"Error reading common words file: {e}")
+        common_words = {"the", "and", "is", "of", "a", "an", "in", "to", "it", "that",
+                         "was", "he", "she", "for", "on", "are", "with", "as", "I", "his",
+                           "they", "at", "be", "this", "have", "from", "or", "had", "but", "not"}  # even smaller list
+    return common_words
+
+
+def analyze_pdf(pdf_path, settings, common_words_file_path, definitions_path,
+                progress=None, cancel_event=None, workers=1, definition_cache_path=None,
+                definitions_index_path=None, page_cache_path=None, library_path=None,
+                instrumentation=None, tokenizer=None, group_lemmas=False, candidates_path=None, level=None):
+    """
+    Runs the full analysis of a PDF and writes the definitions file.
+    Safe to call from a worker thread: it never touches Kivy widgets.
+
+    Args:
+        pdf_path (str): Path to the PDF.
+        settings (dict): One entry of the proficiency settings.
+        common_words_file_path (str): Path to the common words file.
+        definitions_path (str): Where the definitions file is written.
+        progress (callable, optional): Receives status messages for each stage.
+        cancel_event (threading.Event, optional): Cancels the analysis when set.
+        workers (int): Worker processes for the analysis, shared between text extraction
+            and token counting by split_workers.
+        definition_cache_path (str, optional): sqlite file of the persistent definition cache.
+        definitions_index_path (str, optional): Also write the definitions in the
+            memory-mapped binary format to this path.
+        page_cache_path (str, optional): sqlite file of the per-page word count cache.
+            Unchanged pages are not tokenized again, and re-analyzing the same file
+            only re-runs the classification.
+        library_path (str, optional): sqlite file of the book library. The book is
+            added to it, and the definitions index then covers every book in the library.
+        instrumentation (Instrumentation, optional): Collects the time spent in each
+            stage and counters such as tokens seen and cache hits. "count" is wall
+            time and includes "extract", since pages are extracted while counting.
+        tokenizer (str, optional): Tokenizer backend used for counting, see assets.tokenizers.
+        group_lemmas (bool): Fold inflected forms into their lemma before classifying
+            ("obfuscated" and "obfuscating" count as "obfuscate"), see group_word_forms.
+        candidates_path (str, optional): Save the classification candidates here, with
+            definitions resolved for every proficiency level, so reclassify_book can
+            apply another level without the PDF.
+        level (str, optional): Name of the proficiency level the settings belong to,
+            saved with the candidates.
+
+    Returns:
+        tuple: (book_name, difficult_words, new_common_words_len)
+    """
+    instrumentation = resolve_instrumentation(instrumentation)
+    book_name = os.path.splitext(os.path.basename(pdf_path))[0]
+    extract_workers, count_workers = split_workers(workers)
+    with instrumentation.stage("open_pdf"):
+        pages = PdfPages(pdf_path, cancel_event, instrumentation, extract_workers)
+    with instrumentation.stage("load_common_words"):
+        common_words = open_common_words(common_words_file_path)
+    page_cache = PageCountCache(page_cache_path) if page_cache_path else None
+    try:
+        with instrumentation.stage("count"):
+            word_freq, cleaned_words = get_difficult_word_frequencies(
+                pages, common_words, progress, cancel_event, count_workers,
+                page_cache=page_cache, book_key=pdf_file_key(pdf_path) if page_cache else None,
+                instrumentation=instrumentation, tokenizer=tokenizer
+            )
+    finally:
+        if page_cache is not None:
+            page_cache.close()
+
+    if group_lemmas:
+        forms = len(word_freq)
+        with instrumentation.stage("lemmatize"):
+            word_freq = group_word_forms(word_freq, common_words)
+            cleaned_words = word_freq.keys()
+        instrumentation.count("lemmas", len(word_freq))
+        instrumentation.count("forms_folded", forms - len(word_freq))
+
+    # With saved candidates every level is resolved now, so switching later is instant
+    levels = [*PROFICIENCY_SETTINGS.values(), settings] if candidates_path else [settings]
+    candidates = collect_candidates(book_name, cleaned_words, word_freq, levels, definition_cache_path,
+                                    progress, cancel_event, instrumentation)
+    difficult_words, new_common_words = apply_level(candidates, settings, instrumentation=instrumentation)
+    new_common_words_len = _add_common_words(new_common_words, common_words, common_words_file_path,
+                                             instrumentation)
+    check_cancelled(cancel_event)
+
+    with instrumentation.stage("write_outputs"):
+        _write_outputs(book_name, difficult_words, word_freq, definitions_path,
+                       definitions_index_path, library_path)
+        if candidates_path:
+            candidates.level = level
+            candidates.save(candidates_path)
+
+    return book_name, difficult_words, new_common_words_len
+
+
+def reclassify_book(candidates_path, settings, definitions_path, definitions_index_path=None,
+                    library_path=None, definition_cache_path=None, instrumentation=None, level=None):
+    """
+    Applies another proficiency level (or custom thresholds) to the book whose
+    candidates were saved by analyze_pdf, and rewrites its outputs like analyze_pdf
+    does. The PDF is not read; only words that no saved level accepted need a
+    definition lookup. The common words file is left alone: words the analysis
+    found common were added to it then, and merely looking at the book at
+    another level should not change what later books count.
+
+    Args:
+        candidates_path (str): File written by analyze_pdf(candidates_path=...).
+        settings (dict): {"local_limit", "global_freq_limit", "common_word_lower_limit"}.
+        level (str, optional): Name of the level the settings belong to, saved with the
+            candidates; None for custom thresholds.
+        The other arguments are the same as for analyze_pdf.
+
+    Returns:
+        tuple: (book_name, difficult_words)
+
+    Raises:
+        FileNotFoundError: If no usable candidates were saved.
+    """
+    instrumentation = resolve_instrumentation(instrumentation)
+    with instrumentation.stage("load_candidates"):
+        candidates = load_candidates(candidates_path)
+    if candidates is None:
+        raise FileNotFoundError(f"No analyzed book to re-classify at {candidates_path}")
+
+    difficult_words, _ = apply_level(candidates, settings, definition_cache_path,
+                                     instrumentation=instrumentation)
+
+    with instrumentation.stage("write_outputs"):
+        word_freq = dict(zip(candidates.words, candidates.local_freq.tolist()))
+        _write_outputs(candidates.book_name, difficult_words, word_freq, definitions_path,
+                       definitions_index_path, library_path)
+        # Records the new level, and keeps any definitions looked up for these thresholds
+        candidates.level = level
+        candidates.save(candidates_path)
+
+    return candidates.book_name, difficult_words
+
+
+def _write_outputs(book_name, difficult_words, word_freq, definitions_path, definitions_index_path, library_path):
+    with open(definitions_path, "w", encoding="utf-8") as def_file:
+        if book_name:
+            def_file.write(f"__book_name__: {book_name}\n")
+        for word, definition in difficult_words.items():
+            def_file.write(f"{word}: {definition}\n")
+
+    if library_path:
+        library = Library(library_path)
+        try:
+            library.add_book(book_name, difficult_words, word_freq)
+            if definitions_index_path:
+                write_index(definitions_index_path, library.iter_definitions(),
+                            meta={"book_name": book_name, "books": len(library.books())})
+        finally:
+            library.close()
+    elif definitions_index_path:
+        write_index(definitions_index_path, difficult_words.items(), meta={"book_name": book_name})
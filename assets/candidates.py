@@ -0,0 +1,129 @@
+"""
+Classification candidates of the last analyzed book, kept so the book can be
+re-classified at another proficiency level without reading the PDF again.
+
+Every counted word is stored with its local frequency and global frequency, as
+parallel arrays, and the words that any proficiency level accepts also with their
+definition (None when WordNet has none). Applying a level is then a few array
+comparisons; only thresholds looser than every level the file was built for
+need definitions that were not looked up yet.
+
+The file is msgpack, written to a temporary file and renamed into place. It
+also records the proficiency level the book's outputs were last written at,
+which load_candidates_level reads without loading the words. numpy is only
+imported when the arrays are used, so the app can read that at startup.
+"""
+import os
+
+import msgpack
+
+
+# Bump whenever the file layout changes; older files are then ignored
+CANDIDATES_VERSION = 1
+
+
+class Candidates:
+
+    def __init__(self, book_name, words, local_freq, global_freq, definitions=None, level=None):
+        self.book_name = book_name
+        self.level = level  # proficiency level the outputs were last written at, if a preset
+        self.words = words  # list of words
+        self.local_freq = local_freq  # int64 array parallel to words
+        self.global_freq = global_freq  # float64 array parallel to words
+        self.definitions = definitions if definitions is not None else {}  # word → definition or None
+
+    def __len__(self):
+        return len(self.words)
+
+    def classify(self, local_limit, global_freq_limit, common_word_lower_limit):
+        """
+        Applies one set of thresholds to all words at once.
+
+        Returns:
+            tuple: (indexes of accepted words, indexes of words to add to the common words),
+                both in word order.
+        """
+        import numpy as np
+
+        passed_local = self.local_freq <= local_limit
+        globally_rare = self.global_freq < global_freq_limit
+        # Passed the local check, or failed it but the word is globally rare → accept
+        accepted = np.flatnonzero(passed_local | globally_rare)
+        # Failed both: wordfreq rejects it (i.e., it is common globally)
+        common = np.flatnonzero(~passed_local & ~globally_rare & (self.local_freq > common_word_lower_limit))
+        return accepted, common
+
+    def accepted_by_any(self, levels):
+        """Indexes of the words accepted by at least one of the given settings."""
+        import numpy as np
+
+        accepted = np.zeros(len(self.words), dtype=bool)
+        for settings in levels:
+            accepted |= self.local_freq <= settings["local_limit"]
+            accepted |= self.global_freq < settings["global_freq_limit"]
+        return np.flatnonzero(accepted)
+
+    def save(self, path):
+        data = {
+            # version and level come first so load_candidates_level can stop before the words
+            "version": CANDIDATES_VERSION,
+            "level": self.level,
+            "book_name": self.book_name,
+            "words": self.words,
+            "local_freq": self.local_freq.astype("<i8").tobytes(),
+            "global_freq": self.global_freq.astype("<f8").tobytes(),
+            "definitions": self.definitions,
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            msgpack.pack(data, f, use_bin_type=True)
+        os.replace(tmp_path, path)
+
+
+def load_candidates(path):
+    """
+    Reads the candidates saved by Candidates.save.
+
+    Returns:
+        Candidates: Or None if the file is missing, unreadable or from another version.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = msgpack.unpack(f, raw=False)
+    except (OSError, ValueError, msgpack.UnpackException):
+        return None
+    if not isinstance(data, dict) or data.get("version") != CANDIDATES_VERSION:
+        return None
+    import numpy as np
+
+    return Candidates(
+        data["book_name"],
+        data["words"],
+        np.frombuffer(data["local_freq"], dtype="<i8"),
+        np.frombuffer(data["global_freq"], dtype="<f8"),
+        data["definitions"],
+        data.get("level"),
+    )
+
+
+def load_candidates_level(path):
+    """
+    Reads only the proficiency level saved with the candidates.
+
+    Returns:
+        str: Or None if no level was saved, or the file is missing, unreadable or from another version.
+    """
+    try:
+        with open(path, "rb") as f:
+            unpacker = msgpack.Unpacker(f, raw=False)
+            fields = unpacker.read_map_header()
+            if fields < 2 or unpacker.unpack() != "version" or unpacker.unpack() != CANDIDATES_VERSION:
+                return None
+            for _ in range(fields - 1):
+                key = unpacker.unpack()
+                if key == "level":
+                    return unpacker.unpack()
+                unpacker.skip()
+    except (OSError, ValueError, msgpack.UnpackException):
+        return None
+    return None
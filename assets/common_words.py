@@ -0,0 +1,194 @@
+"""
+Common words store: the plain text file stays the source of truth, and a compiled,
+memory-mapped marisa-trie next to it (common_words.txt.trie) answers lookups.
+
+Opening the store maps the trie instead of re-reading and hashing the text
+file, so it costs the same for any number of words. The trie carries a stamp
+of the text file's size and modification time; when the text file changes
+behind its back (e.g. it is reset to the bundled list) the trie is recompiled
+on the next open.
+
+Writers take an exclusive lock on common_words.txt.lock, skip words that are
+already stored, append the rest and recompile the trie, so several analyses
+(threads or processes) can add words at the same time without duplicates.
+"""
+import errno
+import os
+import threading
+from contextlib import contextmanager
+
+import marisa_trie
+
+
+TRIE_SUFFIX = ".trie"
+LOCK_SUFFIX = ".lock"
+
+# Cleaned words are purely alphabetic, so this key can never clash with one
+_STAMP_PREFIX = "\x00stamp:"
+
+# A fallback if the text file is missing
+DEFAULT_COMMON_WORDS = frozenset({
+    "the", "and", "is", "of", "a", "an", "in", "to", "it", "that", "was", "he", "she", "for", "on",
+    "are", "with", "as", "I", "his", "they", "at", "be", "this", "have", "from", "or", "had", "but", "not"
+})
+
+_thread_lock = threading.Lock()
+
+# What msvcrt.locking raises while another process holds the lock
+_LOCK_BUSY_ERRNOS = (errno.EDEADLK, errno.EACCES)
+
+
+@contextmanager
+def file_lock(text_path):
+    """Exclusive lock on the store, held across threads and processes."""
+    with _thread_lock, open(text_path + LOCK_SUFFIX, "a+b") as lock_file:
+        if os.name == "nt":
+            import msvcrt
+            lock_file.seek(0)
+            while True:
+                try:
+                    # LK_LOCK gives up after about 10 seconds; keep waiting
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError as e:
+                    # Only a lock still held elsewhere is worth waiting for
+                    if e.errno not in _LOCK_BUSY_ERRNOS:
+                        raise
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _text_stamp(text_path):
+    stat = os.stat(text_path)
+    return f"{_STAMP_PREFIX}{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class CommonWordsStore:
+    """
+    Set-like view of the common words (supports `in`, len() and iteration).
+    Pickles as its path, so worker processes map the same trie instead of copying the words.
+    """
+
+    def __init__(self, text_path):
+        self.text_path = text_path
+        self.trie_path = text_path + TRIE_SUFFIX
+        self._trie = None
+        self._words = None  # only used when the text file is missing
+        self._open()
+
+    def __reduce__(self):
+        return (CommonWordsStore, (self.text_path,))
+
+    def _open(self):
+        if not os.path.exists(self.text_path):
+            print(f"Common words file not found at {self.text_path}. Using a small default list.")
+            self._words = DEFAULT_COMMON_WORDS
+            return
+        trie = self._map_trie()
+        if trie is None:
+            with file_lock(self.text_path):
+                # Another writer may have compiled it while we waited
+                trie = self._map_trie() or self._compile()
+        self._trie = trie
+
+    def _map_trie(self):
+        """Maps the compiled trie, or returns None if it is missing or out of date."""
+        trie = marisa_trie.Trie()
+        try:
+            trie.mmap(self.trie_path)
+        except Exception:
+            return None
+        return trie if _text_stamp(self.text_path) in trie else None
+
+    def _compile(self, words=None):
+        """
+        Writes the trie for the given words (read from the text file if None).
+        Must hold the file lock. Duplicate lines in the text file are removed.
+        """
+        if words is None:
+            with open(self.text_path, "r", encoding="utf-8") as f:
+                lines = [line.strip() for line in f]
+            words = list(dict.fromkeys(word for word in lines if word))
+            if len(words) != len(lines):
+                self._rewrite_text(words)
+
+        trie = marisa_trie.Trie(list(words) + [_text_stamp(self.text_path)])
+        # Our own mapping has to go before the file can be replaced on Windows
+        self._trie = None
+        tmp_path = self.trie_path + ".tmp"
+        try:
+            trie.save(tmp_path)
+            os.replace(tmp_path, self.trie_path)
+        except OSError as e:
+            # Another process still maps the old trie (Windows); it is recompiled on a later open
+            print(f"Could not update {self.trie_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return trie
+        return self._map_trie() or trie
+
+    def _rewrite_text(self, words):
+        tmp_path = self.text_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(f"{word}\n" for word in words)
+        os.replace(tmp_path, self.text_path)
+
+    def add(self, words):
+        """
+        Appends the words that are not stored yet, in order and without repeats.
+
+        Returns:
+            int: Number of words actually added.
+        """
+        with file_lock(self.text_path):
+            if not os.path.exists(self.text_path):
+                open(self.text_path, "w", encoding="utf-8").close()
+            # Pick up words added by other writers since this store was opened
+            self._trie = self._map_trie() or self._compile()
+
+            new_words = [word for word in dict.fromkeys(words) if word and word not in self._trie]
+            if not new_words:
+                return 0
+            needs_newline = False
+            with open(self.text_path, "rb") as f:
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b"\n"
+            with open(self.text_path, "a", encoding="utf-8") as f:
+                if needs_newline:
+                    f.write("\n")
+                f.writelines(f"{word}\n" for word in new_words)
+
+            self._words = None
+            self._trie = self._compile(list(self) + new_words)
+            return len(new_words)
+
+    def __contains__(self, word):
+        if self._trie is not None:
+            return word in self._trie
+        return word in self._words
+
+    def __iter__(self):
+        if self._trie is None:
+            return iter(self._words)
+        return (word for word in self._trie.iterkeys() if not word.startswith(_STAMP_PREFIX))
+
+    def __len__(self):
+        if self._trie is None:
+            return len(self._words)
+        return len(self._trie) - 1
+
+
+def open_common_words(text_path):
+    """Opens the common words store for a text file, compiling its trie if needed."""
+    return CommonWordsStore(text_path)
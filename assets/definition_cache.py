@@ -0,0 +1,56 @@
+"""
+Persistent WordNet definition cache shared across books.
+
+Definitions are stored in a small sqlite database in the app's data directory.
+Words without a WordNet synset are stored with a NULL definition, so they are
+not looked up again either.
+"""
+import sqlite3
+
+
+# sqlite limits the number of bound parameters per statement
+_PREFETCH_CHUNK = 500
+
+
+class DefinitionCache:
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS definitions (word TEXT PRIMARY KEY, definition TEXT)"
+        )
+
+    def prefetch(self, words):
+        """
+        Loads the cached entries for many words at once.
+
+        Args:
+            words (iterable): Words about to be looked up.
+
+        Returns:
+            dict: {word: definition or None} for every word found in the cache.
+        """
+        words = list(words)
+        cached = {}
+        for start in range(0, len(words), _PREFETCH_CHUNK):
+            chunk = words[start:start + _PREFETCH_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            cached.update(self.conn.execute(
+                f"SELECT word, definition FROM definitions WHERE word IN ({placeholders})", chunk
+            ))
+        return cached
+
+    def store(self, entries):
+        """
+        Saves looked-up definitions; a None definition records a word with no synset.
+
+        Args:
+            entries (dict): {word: definition or None}
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO definitions (word, definition) VALUES (?, ?)", entries.items()
+            )
+
+    def close(self):
+        self.conn.close()
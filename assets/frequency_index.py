@@ -0,0 +1,103 @@
+"""
+Bulk lookup of global word frequencies from wordfreq's "large" English list.
+
+wordfreq.word_frequency tokenizes and normalizes every word it is given. The
+candidate words here are already cleaned to lowercase ASCII, so they can be
+looked up directly in the frequency table, which is loaded once per process.
+"""
+import gzip
+import math
+import os
+import threading
+from array import array
+
+import marisa_trie
+import msgpack
+import numpy as np
+
+
+BUNDLED_WORDLIST = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "wordfreq", "data", "large_en.msgpack.gz")
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def bucket_frequency(index):
+    """
+    Frequency of a word in bucket `index` (i.e. at -index centibels), rounded to
+    3 significant digits exactly as wordfreq.word_frequency rounds it.
+    """
+    freq = 10 ** (-index / 100)
+    leading_zeroes = math.floor(-math.log(freq, 10))
+    return round(freq, leading_zeroes + 3)
+
+
+def read_frequency_buckets(path=BUNDLED_WORDLIST):
+    """
+    Reads a wordfreq cBpack file: a gzipped msgpack list whose first element is
+    a header and whose remaining elements are lists of words, one per centibel.
+    Falls back to wordfreq's own copy if the bundled file is missing.
+    """
+    if not os.path.exists(path):
+        from wordfreq import get_frequency_list
+        return get_frequency_list("en", "large")
+
+    with gzip.open(path, "rb") as f:
+        data = msgpack.load(f, raw=False)
+    header = data[0]
+    if not isinstance(header, dict) or header.get("format") != "cB":
+        raise ValueError(f"{path} is not a wordfreq cBpack file")
+    return data[1:]
+
+
+class GlobalFrequencyIndex:
+    """
+    Word → frequency bucket index backed by a marisa-trie and a parallel array.
+    The trie maps each word to a dense key id; the array holds its bucket.
+    """
+
+    def __init__(self, buckets):
+        words = [word for bucket in buckets for word in bucket]
+        self.trie = marisa_trie.Trie(words)
+        self.buckets = array("H", bytes(2 * len(self.trie)))
+        for index, bucket in enumerate(buckets):
+            for word in bucket:
+                self.buckets[self.trie[word]] = index
+        self.bucket_frequencies = [bucket_frequency(i) for i in range(len(buckets))]
+
+    def frequencies(self, words):
+        """
+        Returns {word: global frequency} for all the given words at once.
+        Words missing from the list get 0.0, like word_frequency(..., minimum=0.0).
+        """
+        trie_get = self.trie.get
+        buckets = self.buckets
+        bucket_frequencies = self.bucket_frequencies
+        result = {}
+        for word in words:
+            key_id = trie_get(word)
+            result[word] = bucket_frequencies[buckets[key_id]] if key_id is not None else 0.0
+        return result
+
+    def frequency_array(self, words):
+        """
+        Returns the global frequency of each word as a numpy array parallel to `words`,
+        0.0 for words missing from the list.
+        """
+        trie_get = self.trie.get
+        buckets = self.buckets
+        missing = len(self.bucket_frequencies)  # index of the 0.0 appended below
+        bucket_ids = np.fromiter(
+            (buckets[key_id] if (key_id := trie_get(word)) is not None else missing for word in words),
+            dtype=np.intp, count=len(words))
+        return np.append(self.bucket_frequencies, 0.0)[bucket_ids]
+
+
+def get_global_frequency_index():
+    """Returns the process-wide index, loading the bundled wordlist on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = GlobalFrequencyIndex(read_frequency_buckets())
+        return _index
@@ -0,0 +1,90 @@
+"""
+Optional timing and counters for the analysis pipeline.
+
+Pipeline functions take an `instrumentation` argument. With an Instrumentation
+they time each stage and count what they did (tokens, cache hits, WordNet
+lookups, ...); with None they use NULL_INSTRUMENTATION, whose methods do
+nothing. Timers and counters are only touched once per stage, page or shard,
+never per token, so the cost is negligible either way.
+
+    instrumentation = Instrumentation()
+    with instrumentation.stage("count"):
+        ...
+    instrumentation.count("tokens", tokens_seen)
+    print(instrumentation.format_report())
+"""
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+
+class Instrumentation:
+
+    def __init__(self):
+        self.timings = {}  # stage → seconds, in the order the stages first ran
+        self.counters = Counter()
+        self.started = time.time()
+
+    @contextmanager
+    def stage(self, name):
+        """Times the block; repeated stages of the same name add up."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def report(self):
+        """
+        Returns:
+            dict: {"started", "timings": {stage: seconds}, "counters": {name: value}}
+        """
+        return {
+            "started": round(self.started, 3),
+            "timings": {name: round(seconds, 4) for name, seconds in self.timings.items()},
+            "counters": dict(self.counters),
+        }
+
+    def format_report(self):
+        """Human readable report, one line per stage and counter."""
+        lines = ["Timings:"]
+        lines += [f"  {name}: {seconds:.3f}s" for name, seconds in self.timings.items()]
+        if self.counters:
+            lines.append("Counters:")
+            lines += [f"  {name}: {value}" for name, value in self.counters.items()]
+        return "\n".join(lines)
+
+    def write_log(self, path, **extra):
+        """Appends the report as one JSON line to a log file, together with any extra fields."""
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({**extra, **self.report()}) + "\n")
+
+
+class _NullInstrumentation:
+    """Stand-in used when instrumentation is disabled."""
+
+    _context = nullcontext()
+
+    def stage(self, name):
+        return self._context
+
+    def add_time(self, name, seconds):
+        pass
+
+    def count(self, name, amount=1):
+        pass
+
+
+NULL_INSTRUMENTATION = _NullInstrumentation()
+
+
+def resolve(instrumentation):
+    """Returns the given instrumentation, or the no-op one for None."""
+    return instrumentation if instrumentation is not None else NULL_INSTRUMENTATION
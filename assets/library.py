@@ -0,0 +1,122 @@
+"""
+Library of every analyzed book and its difficult words, kept in sqlite.
+
+Each word is stored once with its definition; the occurrences table records
+which books it appears in and how often. Both directions are indexed, so
+"words in book X" and "books containing word Y" stay fast with hundreds of
+books, and nothing has to be loaded into memory up front. The app searches a
+memory-mapped index written from iter_definitions() after each analysis.
+"""
+import sqlite3
+import time
+
+
+class Library:
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS books (
+                id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE NOT NULL,
+                analyzed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS words (
+                word TEXT PRIMARY KEY,
+                definition TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS occurrences (
+                book_id INTEGER NOT NULL REFERENCES books(id),
+                word TEXT NOT NULL REFERENCES words(word),
+                count INTEGER NOT NULL,
+                PRIMARY KEY (book_id, word)
+            );
+            CREATE INDEX IF NOT EXISTS occurrences_by_word ON occurrences(word);
+        """)
+
+    def add_book(self, name, difficult_words, word_frequency):
+        """
+        Adds a book, replacing its words if it was analyzed before.
+
+        Args:
+            name (str): Book name.
+            difficult_words (dict): {word: definition} found in the book.
+            word_frequency (Mapping): Local count of each word in the book.
+        """
+        with self.conn:
+            row = self.conn.execute("SELECT id FROM books WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                book_id = self.conn.execute(
+                    "INSERT INTO books (name, analyzed_at) VALUES (?, ?)", (name, time.time())
+                ).lastrowid
+            else:
+                book_id = row[0]
+                self.conn.execute("UPDATE books SET analyzed_at = ? WHERE id = ?", (time.time(), book_id))
+                self.conn.execute("DELETE FROM occurrences WHERE book_id = ?", (book_id,))
+
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO words (word, definition) VALUES (?, ?)",
+                difficult_words.items()
+            )
+            self.conn.executemany(
+                "INSERT INTO occurrences (book_id, word, count) VALUES (?, ?, ?)",
+                ((book_id, word, word_frequency.get(word, 0)) for word in difficult_words)
+            )
+            self._remove_orphan_words()
+
+    def remove_book(self, name):
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM occurrences WHERE book_id = (SELECT id FROM books WHERE name = ?)", (name,)
+            )
+            self.conn.execute("DELETE FROM books WHERE name = ?", (name,))
+            self._remove_orphan_words()
+
+    def _remove_orphan_words(self):
+        self.conn.execute(
+            "DELETE FROM words WHERE NOT EXISTS (SELECT 1 FROM occurrences WHERE occurrences.word = words.word)"
+        )
+
+    def books(self):
+        """
+        Returns:
+            list: (book name, number of difficult words), oldest analysis first.
+        """
+        return self.conn.execute("""
+            SELECT books.name, COUNT(occurrences.word) FROM books
+            LEFT JOIN occurrences ON occurrences.book_id = books.id
+            GROUP BY books.id ORDER BY books.analyzed_at
+        """).fetchall()
+
+    def words_in_book(self, name):
+        """
+        Returns:
+            list: (word, definition, count in the book), sorted by word.
+        """
+        return self.conn.execute("""
+            SELECT words.word, words.definition, occurrences.count FROM occurrences
+            JOIN books ON books.id = occurrences.book_id
+            JOIN words ON words.word = occurrences.word
+            WHERE books.name = ? ORDER BY words.word
+        """, (name,)).fetchall()
+
+    def books_with_word(self, word):
+        """
+        Returns:
+            list: (book name, count), most frequent first.
+        """
+        return self.conn.execute("""
+            SELECT books.name, occurrences.count FROM occurrences
+            JOIN books ON books.id = occurrences.book_id
+            WHERE occurrences.word = ? ORDER BY occurrences.count DESC, books.name
+        """, (word,)).fetchall()
+
+    def word_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+
+    def iter_definitions(self):
+        """Yields (word, definition) for every word across all books, sorted by word."""
+        yield from self.conn.execute("SELECT word, definition FROM words ORDER BY word")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,224 @@
+"""
+Read-only, memory-mapped string → string index stored in a single binary file.
+
+Layout (all integers little-endian uint32):
+
+    magic "WSIX", version, entry count, meta length, hash slot count
+    meta             JSON object with free-form metadata
+    key offsets      count + 1 offsets into the key blob
+    value starts     count offsets into the value blob
+    value ends       count offsets into the value blob
+    hash slots       open-addressing table of entry number + 1 (0 = empty),
+                     keyed by crc32 of the key, linear probing
+    key blob         UTF-8 keys, sorted by their bytes
+    value blob       UTF-8 values; identical values are stored once
+
+Opening a file only reads the header, so it costs the same for ten entries or
+a million. Exact lookups go through the hash slots; the sorted keys allow
+ordered iteration and range scans.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping
+
+
+MAGIC = b"WSIX"
+VERSION = 1
+_HEADER = struct.Struct("<4sIIII")
+
+
+def write_index(path, items, meta=None):
+    """
+    Writes (key, value) pairs to an index file.
+
+    Args:
+        path (str): Destination file.
+        items (iterable): (key, value) string pairs. Later duplicates of a key win.
+        meta (dict, optional): JSON-serializable metadata stored in the header.
+    """
+    entries = {}
+    for key, value in items:
+        entries[key.encode("utf-8")] = value.encode("utf-8")
+    keys = sorted(entries)
+
+    key_offsets = array("I", [0])
+    value_starts = array("I")
+    value_ends = array("I")
+    value_positions = {}
+    key_blob = bytearray()
+    value_blob = bytearray()
+    for key in keys:
+        key_blob += key
+        key_offsets.append(len(key_blob))
+        value = entries[key]
+        if value not in value_positions:
+            value_positions[value] = (len(value_blob), len(value_blob) + len(value))
+            value_blob += value
+        start, end = value_positions[value]
+        value_starts.append(start)
+        value_ends.append(end)
+
+    # At most half full, so probe chains stay short
+    slot_count = 1
+    while slot_count < 2 * len(keys):
+        slot_count *= 2
+    slots = array("I", bytes(4 * slot_count))
+    mask = slot_count - 1
+    for i, key in enumerate(keys):
+        slot = zlib.crc32(key) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = i + 1
+
+    if sys.byteorder != "little":
+        for table in (key_offsets, value_starts, value_ends, slots):
+            table.byteswap()
+
+    meta_bytes = json.dumps(meta or {}).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(keys), len(meta_bytes), slot_count))
+        f.write(meta_bytes)
+        f.write(key_offsets.tobytes())
+        f.write(value_starts.tobytes())
+        f.write(value_ends.tobytes())
+        f.write(slots.tobytes())
+        f.write(key_blob)
+        f.write(value_blob)
+
+
+class MappedIndex(Mapping):
+    """
+    Dict-like, read-only view of an index file. Keys iterate in sorted order.
+    Call close() before replacing the file: Windows cannot replace a mapped file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file cannot be mapped
+            self._file.close()
+            raise ValueError(f"{path} is not an index file")
+
+        magic, version, count, meta_len, slot_count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not an index file")
+
+        self._count = count
+        pos = _HEADER.size
+        self.meta = json.loads(self._mm[pos:pos + meta_len].decode("utf-8"))
+        pos += meta_len
+
+        self._key_offsets = self._table(pos, count + 1)
+        pos += 4 * (count + 1)
+        self._value_starts = self._table(pos, count)
+        pos += 4 * count
+        self._value_ends = self._table(pos, count)
+        pos += 4 * count
+        self._slots = self._table(pos, slot_count)
+        self._slot_mask = slot_count - 1
+        pos += 4 * slot_count
+        self._key_base = pos
+        self._value_base = pos + self._key_offsets[count]
+
+    def _table(self, pos, length):
+        table = memoryview(self._mm)[pos:pos + 4 * length]
+        if sys.byteorder != "little":
+            # Only big-endian machines pay for a copy
+            swapped = array("I", table.tobytes())
+            swapped.byteswap()
+            return swapped
+        return table.cast("I")
+
+    def _key_bytes(self, i):
+        base = self._key_base
+        return self._mm[base + self._key_offsets[i]:base + self._key_offsets[i + 1]]
+
+    def _value(self, i):
+        base = self._value_base
+        return self._mm[base + self._value_starts[i]:base + self._value_ends[i]].decode("utf-8")
+
+    def _bisect(self, target):
+        """Position of the first key >= target (target given as bytes)."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_bytes(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, key):
+        target = key.encode("utf-8")
+        slots = self._slots
+        mask = self._slot_mask
+        slot = zlib.crc32(target) & mask
+        entry = slots[slot]
+        while entry:
+            if self._key_bytes(entry - 1) == target:
+                return entry - 1
+            slot = (slot + 1) & mask
+            entry = slots[slot]
+        return -1
+
+    def __getitem__(self, key):
+        i = self._find(key) if isinstance(key, str) else -1
+        if i < 0:
+            raise KeyError(key)
+        return self._value(i)
+
+    def __contains__(self, key):
+        return isinstance(key, str) and self._find(key) >= 0
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._key_bytes(i).decode("utf-8")
+
+    def complete(self, prefix, limit):
+        """
+        Returns up to `limit` keys starting with prefix, in sorted order.
+        A binary search finds the first one, so this is O(log n + limit).
+        """
+        target = prefix.encode("utf-8")
+        matches = []
+        i = self._bisect(target)
+        while i < self._count and len(matches) < limit:
+            key = self._key_bytes(i)
+            if not key.startswith(target):
+                break
+            matches.append(key.decode("utf-8"))
+            i += 1
+        return matches
+
+    def close(self):
+        if self._mm is not None:
+            # Views into the map must be released before it can be closed
+            for table in ("_key_offsets", "_value_starts", "_value_ends", "_slots"):
+                view = getattr(self, table, None)
+                if isinstance(view, memoryview):
+                    view.release()
+            self._mm.close()
+            self._mm = None
+            self._file.close()
+
+
+def open_index(path):
+    """Opens an index file, returning None if it is missing or not an index."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return MappedIndex(path)
+    except (OSError, ValueError, struct.error):
+        return None
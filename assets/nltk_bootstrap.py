@@ -0,0 +1,96 @@
+"""
+Makes sure the NLTK data the analysis needs is available, preferring what is already on disk.
+
+Each resource is looked up on NLTK's data path first (the app's own
+assets/nltk_data plus NLTK's usual locations), then copied from a local mirror
+directory if one is given, and only then downloaded. A mirror is laid out like
+an nltk_data directory, e.g. mirror/corpora/wordnet.zip or mirror/corpora/wordnet/.
+The mirror can also be set with the WORD_SEARCH_NLTK_MIRROR environment variable.
+"""
+import os
+import shutil
+
+
+# NLTK resource path → package name understood by nltk.download
+REQUIRED_RESOURCES = {
+    "tokenizers/punkt": "punkt",
+    "tokenizers/punkt_tab": "punkt_tab",
+    "corpora/wordnet": "wordnet",
+    "corpora/omw-1.4": "omw-1.4",
+}
+
+MIRROR_ENV_VAR = "WORD_SEARCH_NLTK_MIRROR"
+
+
+def missing_resources(resources=REQUIRED_RESOURCES):
+    """Returns the resource paths NLTK cannot find on its current data path."""
+    import nltk
+
+    missing = []
+    for resource_path in resources:
+        try:
+            nltk.data.find(resource_path)
+        except LookupError:
+            missing.append(resource_path)
+    return missing
+
+
+def copy_from_mirror(resource_path, mirror, data_dir):
+    """
+    Copies one resource (directory or .zip) from a mirror into data_dir.
+
+    Returns:
+        bool: False if the mirror does not have it.
+    """
+    for suffix in ("", ".zip"):
+        src = os.path.join(mirror, resource_path + suffix)
+        dst = os.path.join(data_dir, resource_path + suffix)
+        if os.path.isdir(src):
+            shutil.copytree(src, dst, dirs_exist_ok=True)
+            return True
+        if os.path.isfile(src):
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copyfile(src, dst)
+            return True
+    return False
+
+
+def ensure_nltk_data(data_dir, mirror=None, allow_download=True, progress=None,
+                     resources=REQUIRED_RESOURCES):
+    """
+    Adds data_dir to NLTK's data path and fetches whatever required resource is missing.
+    Blocking; call it from a background thread.
+
+    Args:
+        data_dir (str): Writable nltk_data directory owned by the app.
+        mirror (str, optional): Local nltk_data-style directory to copy from.
+            Defaults to the WORD_SEARCH_NLTK_MIRROR environment variable.
+        allow_download (bool): Whether to fall back to nltk.download.
+        progress (callable, optional): Receives status messages; nothing is
+            reported when all data is already present.
+
+    Returns:
+        list: Resource paths that are still missing (empty on success).
+    """
+    import nltk
+
+    os.makedirs(data_dir, exist_ok=True)
+    if data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+
+    missing = missing_resources(resources)
+    if not missing:
+        return []
+
+    mirror = mirror or os.environ.get(MIRROR_ENV_VAR)
+    for resource_path in missing:
+        package = resources[resource_path]
+        if mirror and copy_from_mirror(resource_path, mirror, data_dir):
+            if progress:
+                progress(f"Copied NLTK data '{package}' from {mirror}")
+        elif allow_download:
+            if progress:
+                progress(f"Downloading NLTK data '{package}'...")
+            nltk.download(package, download_dir=data_dir, quiet=True)
+
+    return missing_resources(resources)
@@ -0,0 +1,133 @@
+"""
+Persistent cache of per-page word counts, keyed by a hash of each page's text.
+
+Counts are stored before common words are removed, so they stay valid while the
+common words list grows; the filtering happens when pages are merged. Every
+analyzed PDF also records its list of page hashes under a key made of its path,
+size and modification time, so analyzing the same file again (for example at
+another proficiency level) does not even have to extract its text. prune() drops
+the lists of files that changed or disappeared, and the pages only they used.
+"""
+import hashlib
+import os
+import sqlite3
+from collections import Counter
+
+import msgpack
+
+
+# Part of every page key; bump it whenever a tokenizer or the cleaning changes
+COUNT_VERSION = 1
+
+# sqlite limits the number of bound parameters per statement
+_GET_CHUNK = 500
+
+
+def page_hash(text, tokenizer="nltk"):
+    """Key of a page's text in the cache; counts made with different tokenizers are kept apart."""
+    digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+    return f"{COUNT_VERSION}:{tokenizer}:{digest}"
+
+
+def pdf_file_key(path):
+    """Identifies one version of a file on disk: path, size and modification time."""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+class PageCountCache:
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages (hash TEXT PRIMARY KEY, tokens INTEGER, counts BLOB)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS books (file_key TEXT PRIMARY KEY, page_hashes BLOB)"
+        )
+
+    def get(self, key):
+        """
+        Returns:
+            tuple: (Counter of cleaned words, number of raw tokens), or None if the page is unknown.
+        """
+        row = self.conn.execute("SELECT tokens, counts FROM pages WHERE hash = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        tokens, counts = row
+        return Counter(msgpack.unpackb(counts)), tokens
+
+    def get_many(self, keys):
+        """
+        Loads many pages at once.
+
+        Returns:
+            dict: {key: (Counter, tokens)} for every key found in the cache.
+        """
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), _GET_CHUNK):
+            chunk = keys[start:start + _GET_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for key, tokens, counts in self.conn.execute(
+                f"SELECT hash, tokens, counts FROM pages WHERE hash IN ({placeholders})", chunk
+            ):
+                found[key] = (Counter(msgpack.unpackb(counts)), tokens)
+        return found
+
+    def store(self, entries):
+        """
+        Saves newly counted pages.
+
+        Args:
+            entries (dict): {key: (Counter, tokens)}
+        """
+        if not entries:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO pages (hash, tokens, counts) VALUES (?, ?, ?)",
+                ((key, tokens, msgpack.packb(dict(counts)))
+                 for key, (counts, tokens) in entries.items())
+            )
+
+    def book_pages(self, file_key):
+        """Returns the page hashes recorded for a file, in page order, or None."""
+        row = self.conn.execute("SELECT page_hashes FROM books WHERE file_key = ?", (file_key,)).fetchone()
+        return msgpack.unpackb(row[0]) if row is not None else None
+
+    def store_book(self, file_key, page_hashes):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO books (file_key, page_hashes) VALUES (?, ?)",
+                (file_key, msgpack.packb(list(page_hashes)))
+            )
+
+    def prune(self):
+        """
+        Forgets files that no longer match their recorded size and modification
+        time, then deletes every page that no remaining file refers to.
+        """
+        books = self.conn.execute("SELECT file_key FROM books").fetchall()
+        stale = [(key,) for key, in books if not _file_unchanged(key)]
+        with self.conn:
+            self.conn.executemany("DELETE FROM books WHERE file_key = ?", stale)
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS used (hash TEXT PRIMARY KEY)")
+            self.conn.execute("DELETE FROM used")
+            for page_hashes, in self.conn.execute("SELECT page_hashes FROM books"):
+                self.conn.executemany("INSERT OR IGNORE INTO used (hash) VALUES (?)",
+                                      ((key,) for key in msgpack.unpackb(page_hashes)))
+            self.conn.execute("DELETE FROM pages WHERE hash NOT IN (SELECT hash FROM used)")
+            self.conn.execute("DELETE FROM used")
+
+    def close(self):
+        self.conn.close()
+
+
+def _file_unchanged(book_key):
+    # Book keys are a pdf_file_key followed by the tokenizer name
+    path, size, mtime, _ = book_key.rsplit("|", 3)
+    try:
+        return pdf_file_key(path) == f"{path}|{size}|{mtime}"
+    except OSError:
+        return False
@@ -0,0 +1,144 @@
+"""
+Streaming export of the definitions file to a searchable PDF.
+
+Lines are read one at a time and wrapped with the real font metrics (word
+widths are measured once and reused), and each page is drawn as a single text
+object, so the export stays fast and flat in memory for any number of entries.
+Page streams are written without reportlab's ASCII85 layer over the compression.
+"""
+import os
+from itertools import chain
+
+
+FONT_NAME = "Helvetica"
+FONT_SIZE = 12
+LINE_HEIGHT = 14
+MARGIN = 40
+
+
+class _LineWrapper:
+    """Greedy word wrapping by rendered width, with a cache of word widths."""
+
+    def __init__(self, max_width, font_name=FONT_NAME, font_size=FONT_SIZE):
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+
+        self.max_width = max_width
+        self._measure = lambda text: stringWidth(text, font_name, font_size)
+        self._space = self._measure(" ")
+        self._widths = {}
+
+    def width(self, word):
+        width = self._widths.get(word)
+        if width is None:
+            width = self._widths[word] = self._measure(word)
+        return width
+
+    def _split_long_word(self, word):
+        # A word wider than the line is cut where it no longer fits
+        pieces = []
+        piece = ""
+        for char in word:
+            if piece and self._measure(piece + char) > self.max_width:
+                pieces.append(piece)
+                piece = ""
+            piece += char
+        pieces.append(piece)
+        return pieces
+
+    def wrap(self, line):
+        """Returns the line split into pieces no wider than max_width (empty list for a blank line)."""
+        lines = []
+        current = []
+        current_width = 0.0
+        for word in line.split():
+            word_width = self.width(word)
+            if word_width > self.max_width:
+                if current:
+                    lines.append(" ".join(current))
+                pieces = self._split_long_word(word)
+                lines.extend(pieces[:-1])
+                current, current_width = [pieces[-1]], self._measure(pieces[-1])
+                continue
+            needed = word_width if not current else current_width + self._space + word_width
+            if needed > self.max_width:
+                lines.append(" ".join(current))
+                current, current_width = [word], word_width
+            else:
+                current.append(word)
+                current_width = needed
+        if current:
+            lines.append(" ".join(current))
+        return lines
+
+
+def _iter_lines(txt_path):
+    with open(txt_path, "r", encoding="utf-8") as file:
+        for line in file:
+            yield line.strip()
+
+
+def export_definitions_pdf(txt_path, pdf_path, progress=None):
+    """
+    Writes the definitions file as a PDF.
+
+    Args:
+        txt_path (str): Definitions file, one "word: definition" entry per line.
+        pdf_path (str): Destination PDF.
+        progress (callable, optional): Called with a status message after each page.
+
+    Returns:
+        int: Number of pages written.
+
+    Raises:
+        ValueError: If the definitions file is empty.
+    """
+    from reportlab import rl_config
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import A4
+
+    lines = _iter_lines(txt_path)
+    # Find the first entry before creating the PDF, without reading the rest
+    first = next((line for line in lines if line), None)
+    if first is None:
+        raise ValueError("Text file is empty. PDF will not be created.")
+
+    width, height = A4
+    lines_per_page = int((height - 2 * MARGIN) // LINE_HEIGHT) + 1
+    wrapper = _LineWrapper(width - 2 * MARGIN)
+
+    c = canvas.Canvas(pdf_path, pagesize=A4)
+    pages = 0
+    text = None
+    used = lines_per_page
+    # The compressed page streams are binary-safe already; reportlab reads this
+    # setting while saving, so it is switched off only for this export
+    use_a85 = rl_config.useA85
+    rl_config.useA85 = 0
+    try:
+        for line in chain([first], lines):
+            for piece in wrapper.wrap(line):
+                if used == lines_per_page:
+                    if text is not None:
+                        c.drawText(text)
+                        c.showPage()
+                        pages += 1
+                        if progress is not None:
+                            progress(f"Exporting PDF: page {pages}")
+                    text = c.beginText(MARGIN, height - MARGIN)
+                    text.setFont(FONT_NAME, FONT_SIZE, LINE_HEIGHT)
+                    used = 0
+                text.textLine(piece)
+                used += 1
+        if text is not None:
+            c.drawText(text)
+            c.showPage()
+            pages += 1
+        c.save()
+    except BaseException:
+        # Never leave a half-written PDF behind
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+        raise
+    finally:
+        rl_config.useA85 = use_a85
+    return pages
@@ -0,0 +1,325 @@
+"""
+In-memory indexes used by the search box.
+"""
+import threading
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from difflib import SequenceMatcher
+from heapq import heappush, heapreplace
+
+from assets.mapped_index import MappedIndex
+
+
+class PrefixIndex:
+    """
+    Sorted array of words for prefix completion in O(log n + k).
+    Used for definitions parsed from the text file; a MappedIndex is already
+    sorted on disk and answers complete() itself.
+    """
+
+    def __init__(self, words):
+        self.words = sorted(words)
+
+    def complete(self, prefix, limit):
+        """Returns up to `limit` words starting with prefix, in sorted order."""
+        words = self.words
+        matches = []
+        i = bisect_left(words, prefix)
+        while i < len(words) and len(matches) < limit and words[i].startswith(prefix):
+            matches.append(words[i])
+            i += 1
+        return matches
+
+
+def build_prefix_index(word_definitions):
+    """Returns an object with complete(prefix, limit) for the loaded definitions."""
+    if isinstance(word_definitions, MappedIndex):
+        return word_definitions
+    return PrefixIndex(word_definitions)
+
+
+def _deletes(word, max_distance):
+    """All strings obtained by deleting up to max_distance characters from word."""
+    variants = [word]
+
+    def delete_from(w, start, depth):
+        # Deleting at non-decreasing positions reaches every combination once
+        for i in range(start, len(w)):
+            variant = w[:i] + w[i + 1:]
+            variants.append(variant)
+            if depth > 1:
+                delete_from(variant, i, depth - 1)
+
+    delete_from(word, 0, max_distance)
+    return set(variants)
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions).
+    Returns max_distance + 1 as soon as the distance is known to exceed max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    # A typo only touches a few characters, so the common prefix and suffix
+    # can be skipped and the table stays tiny
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return min(len(a) + len(b), max_distance + 1)
+
+    len_b = len(b)
+    before_previous = None
+    previous = list(range(len_b + 1))
+    for i in range(1, len(a) + 1):
+        char_a = a[i - 1]
+        current = [i] * (len_b + 1)
+        row_min = i
+        for j in range(1, len_b + 1):
+            value = previous[j - 1] + (char_a != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == b[j - 1] \
+                    and before_previous[j - 2] + 1 < value:
+                value = before_previous[j - 2] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        # A transposition can reach back two rows, so both must be over the limit
+        if row_min > max_distance and min(previous) > max_distance:
+            return max_distance + 1
+        before_previous, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+# Same as difflib.get_close_matches: weaker matches are not suggested
+RATIO_CUTOFF = 0.6
+
+# Letters a-z, then everything else in one column
+_LETTER_COLUMNS = 27
+
+
+def _letter_counts(words):
+    """(27, len(words)) array of how often each letter occurs in each word."""
+    import numpy as np
+
+    counts = np.zeros((_LETTER_COLUMNS, len(words)), dtype=np.uint8)
+    for i, word in enumerate(words):
+        for char in word:
+            column = ord(char) - 97
+            counts[column if 0 <= column < 26 else 26, i] += 1
+    return counts
+
+
+class _Table(namedtuple("_Table", "id_to_word word_to_id hashes word_ids letter_counts lengths")):
+    """
+    One version of a FuzzyIndex; updates build a new one and swap it in whole.
+
+    id_to_word (ID → word, None once removed) and word_to_id map the IDs;
+    hashes and word_ids are the sorted delete table; letter_counts and
+    lengths are per word ID (zero for removed words).
+    """
+
+
+class FuzzyIndex:
+    """
+    "Did you mean" index that ranks like difflib.get_close_matches without
+    comparing every word.
+
+    Words one typo away (edit distance max_distance, with transpositions) come
+    first. They are found SymSpell-style: every word is stored under the strings
+    left after deleting up to max_distance characters from its first
+    prefix_length characters, and a query only compares the words sharing one
+    of its own deletes. The table is two sorted parallel arrays, the hash of
+    each delete and the ID of its word; a hash collision only adds a candidate,
+    which the edit distance then rejects.
+
+    The other slots go to the words with the best difflib similarity ratio, so
+    misspellings several edits away ("perspicashus") are still found. The
+    ratio never exceeds difflib's quick_ratio, which only depends on how many
+    letters two words share. That bound is computed for all words at once
+    from an array of letter counts, and words are compared in decreasing order
+    of it until no remaining word can beat the ones found; the result is the
+    same as comparing every word.
+
+    The index is meant to be kept across reloads of the definitions: update()
+    only indexes the words that were added and drops removed words by ID.
+    While an update started by update_async runs, suggest() returns None
+    instead of waiting for it.
+    """
+
+    def __init__(self, words=(), max_distance=1, prefix_length=7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        # numpy is only imported by the first update, which runs off the UI thread
+        self._table = None
+        self._lock = threading.Lock()  # one update at a time
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        if words:
+            self.update(words)
+
+    @property
+    def ready(self):
+        """False while an update started by update_async has not finished."""
+        return self._pending == 0
+
+    def _deletes_of(self, words, first_id):
+        import numpy as np
+
+        # Typed arrays hold the hashes as 8 bytes each while they are collected
+        hashes = array("q")
+        counts = array("l")
+        for word in words:
+            variants = _deletes(word[:self.prefix_length], self.max_distance)
+            hashes.extend(map(hash, variants))
+            counts.append(len(variants))
+        word_ids = np.repeat(np.arange(first_id, first_id + len(words), dtype=np.int32), counts)
+        return np.frombuffer(hashes, dtype=np.int64), word_ids
+
+    def update(self, words):
+        """Makes the index hold exactly the given words."""
+        import numpy as np
+
+        with self._lock:
+            table = self._table
+            if table is None:
+                table = _Table([], {}, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32),
+                               _letter_counts(()), np.empty(0, dtype=np.int32))
+            id_to_word, word_to_id, hashes, word_ids, letter_counts, lengths = table
+            words = set(words)
+            removed = [word_id for word, word_id in word_to_id.items() if word not in words]
+            added = sorted(words.difference(word_to_id))
+            if not removed and not added:
+                return
+            if len(id_to_word) + len(added) > 2 * len(words):
+                # Mostly new words (e.g. another book): start over so IDs stay dense
+                id_to_word, word_to_id = [], {}
+                hashes, word_ids = hashes[:0], word_ids[:0]
+                letter_counts, lengths = letter_counts[:, :0], lengths[:0]
+                added = sorted(words)
+            else:
+                id_to_word = list(id_to_word)
+                word_to_id = dict(word_to_id)
+                if removed:
+                    for word_id in removed:
+                        del word_to_id[id_to_word[word_id]]
+                        id_to_word[word_id] = None
+                    kept = ~np.isin(word_ids, removed)
+                    hashes, word_ids = hashes[kept], word_ids[kept]
+                    letter_counts, lengths = letter_counts.copy(), lengths.copy()
+                    letter_counts[:, removed] = 0
+                    lengths[removed] = 0
+
+            new_hashes, new_ids = self._deletes_of(added, len(id_to_word))
+            for word in added:
+                word_to_id[word] = len(id_to_word)
+                id_to_word.append(word)
+            hashes = np.concatenate((hashes, new_hashes))
+            word_ids = np.concatenate((word_ids, new_ids))
+            order = np.argsort(hashes, kind="stable")
+            self._table = _Table(id_to_word, word_to_id, hashes[order], word_ids[order],
+                                 np.concatenate((letter_counts, _letter_counts(added)), axis=1),
+                                 np.concatenate((lengths, np.array([len(w) for w in added], dtype=np.int32))))
+
+    def update_async(self, words):
+        """Runs update on a background thread; suggest returns None until it is done."""
+        with self._pending_lock:
+            self._pending += 1
+
+        def run():
+            try:
+                self.update(words)
+            finally:
+                with self._pending_lock:
+                    self._pending -= 1
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def suggest(self, word, n=3):
+        """
+        Returns up to n suggestions for word: words within max_distance edits first,
+        then the most similar words by difflib's ratio (at least RATIO_CUTOFF).
+        Ties are broken like get_close_matches. Returns None while the index is
+        being updated.
+        """
+        if not self.ready:
+            return None
+        table = self._table
+        if table is None or not word:
+            return []
+
+        typos = [candidate for candidate in self._typo_candidates(table, word)
+                 if edit_distance(word, candidate, self.max_distance) <= self.max_distance]
+        typos.sort(key=lambda candidate: (_ratio(candidate, word), candidate), reverse=True)
+        suggestions = typos[:n]
+        if len(suggestions) < n:
+            suggestions += self._most_similar(table, word, n - len(suggestions), set(suggestions))
+        return suggestions
+
+    def _typo_candidates(self, table, word):
+        import numpy as np
+
+        variants = np.fromiter(map(hash, _deletes(word[:self.prefix_length], self.max_distance)),
+                               dtype=np.int64)
+        starts = np.searchsorted(table.hashes, variants, side="left")
+        stops = np.searchsorted(table.hashes, variants, side="right")
+        return {table.id_to_word[word_id]
+                for start, stop in zip(starts.tolist(), stops.tolist()) if start < stop
+                for word_id in table.word_ids[start:stop].tolist()}
+
+    def _most_similar(self, table, word, n, exclude):
+        """The n words with the best ratio, as get_close_matches would return them."""
+        import numpy as np
+
+        # Letters shared with each word: only the query's own letters can contribute
+        query_counts = _letter_counts((word,))[:, 0]
+        shared = np.zeros(len(table.lengths), dtype=np.int32)
+        for column in np.flatnonzero(query_counts).tolist():
+            shared += np.minimum(table.letter_counts[column], query_counts[column])
+        bound = 2.0 * shared / (table.lengths + len(word))  # quick_ratio of each word
+        ids = np.flatnonzero(bound >= RATIO_CUTOFF)
+        ids = ids[np.argsort(-bound[ids], kind="stable")]
+
+        matcher = SequenceMatcher()
+        matcher.set_seq2(word)  # like get_close_matches; the query's side is analysed once
+        best = []  # heap of the n best (ratio, word)
+        for word_id, word_bound in zip(ids.tolist(), bound[ids].tolist()):
+            if len(best) == n and word_bound < best[0][0]:
+                break  # no word left can do better
+            candidate = table.id_to_word[word_id]
+            if candidate in exclude:
+                continue
+            matcher.set_seq1(candidate)
+            ratio = matcher.ratio()
+            if ratio >= RATIO_CUTOFF:
+                if len(best) < n:
+                    heappush(best, (ratio, candidate))
+                elif (ratio, candidate) > best[0]:
+                    heapreplace(best, (ratio, candidate))
+        return [candidate for _, candidate in sorted(best, reverse=True)]
+
+
+def _ratio(candidate, word):
+    # Same argument order as get_close_matches; the ratio is not symmetric
+    return SequenceMatcher(None, candidate, word).ratio()
+
+
+def build_fuzzy_index(word_definitions, fuzzy_index=None):
+    """
+    Returns a FuzzyIndex over the loaded definitions, updated on a background thread.
+    Pass the index of the previous load to only index the words that changed.
+    """
+    if fuzzy_index is None:
+        fuzzy_index = FuzzyIndex()
+    fuzzy_index.update_async(list(word_definitions))
+    return fuzzy_index
@@ -0,0 +1,65 @@
+"""
+Tokenizer backends for word counting.
+
+    nltk   NLTK's word_tokenize: Punkt sentence splitting plus the Treebank rules.
+           The reference behaviour, and the default.
+    regex  One compiled pattern over the page text. It only yields the word
+           tokens, which is all the counting keeps after normalize_token
+           anyway, and splits them like NLTK does, at a fraction of the cost.
+
+The backend is picked by name, either passed explicitly or through the
+WORD_SEARCH_TOKENIZER environment variable. Names rather than functions are
+handed around so they can be sent to worker processes and be part of cache keys.
+benchmarks/bench_tokenizers.py measures how far the backends diverge.
+"""
+import os
+
+import regex
+
+
+TOKENIZER_ENV_VAR = "WORD_SEARCH_TOKENIZER"
+DEFAULT_TOKENIZER = "nltk"
+
+# Follows the Treebank rules where they matter to the counting: words keep
+# inner hyphens, slashes, periods and apostrophes ("well-known", "and/or",
+# "U.S", "o'clock"), while the clitics n't, 's, 'm, 'd, 'll, 're and 've are
+# split off ("don't" → "do", "n't"). The lookbehind gives the "n" of a
+# following "n't" back instead of trying every prefix of every word.
+_WORD = regex.compile(r"""
+      n't\b
+    | '(?:s|m|d|ll|re|ve)\b
+    | \p{L}+(?:(?:[-/.]|'(?!(?:s|m|d|ll|re|ve|t)\b))\p{L}+)*(?<!n(?='t\b))
+""", regex.VERBOSE | regex.IGNORECASE)
+
+
+def nltk_tokenize(text):
+    from nltk.tokenize import word_tokenize
+    return word_tokenize(text)
+
+
+def regex_tokenize(text):
+    return _WORD.findall(text)
+
+
+TOKENIZERS = {
+    "nltk": nltk_tokenize,
+    "regex": regex_tokenize,
+}
+
+
+def tokenizer_name(name=None):
+    """
+    Resolves the backend to use: the given name, else the environment variable, else nltk.
+
+    Raises:
+        ValueError: If the name is not one of TOKENIZERS.
+    """
+    name = name or os.environ.get(TOKENIZER_ENV_VAR) or DEFAULT_TOKENIZER
+    if name not in TOKENIZERS:
+        raise ValueError(f"Unknown tokenizer {name!r}; expected one of {', '.join(TOKENIZERS)}")
+    return name
+
+
+def get_tokenizer(name=None):
+    """Returns the tokenize function (str → list of raw tokens) of a backend."""
+    return TOKENIZERS[tokenizer_name(name)]
@@ -0,0 +1,158 @@
+"""
+Integer-ID vocabulary and array-backed word counts.
+
+Every distinct cleaned word gets a small integer ID the first time it is seen,
+in order of first appearance. A page is counted by turning its tokens into an
+array of IDs and adding numpy.bincount of it to the counts, instead of updating
+a Counter once per token. Raw tokens have an ID table of their own, so a
+spelling seen before costs a single dict lookup (done in C through map());
+normalize_token only runs for new spellings.
+
+WordFrequencies holds the vocabulary and the counts as a parallel array. It is
+a read-only Mapping like the Counter it replaces, and the classification works
+on its arrays directly.
+"""
+from collections.abc import Mapping
+
+import numpy as np
+
+
+# ID of tokens that are not counted: nothing left after cleaning, or a skipped word
+SKIPPED = -1
+
+
+class Vocabulary:
+    """
+    Interns cleaned words to consecutive integer IDs.
+
+    Args:
+        normalize (callable, optional): Raw token → cleaned word or None. Needed by token_ids.
+        skip (set, optional): Cleaned words that never get an ID, e.g. the common words.
+    """
+
+    def __init__(self, normalize=None, skip=frozenset()):
+        self.normalize = normalize
+        self.skip = skip
+        self.words = []  # ID → word
+        self._word_ids = {}  # word → ID, or SKIPPED
+        self._token_ids = {}  # raw token → ID, or SKIPPED
+
+    def __len__(self):
+        return len(self.words)
+
+    def word_id(self, word):
+        """Returns the ID of a cleaned word, adding it if it is new, or SKIPPED."""
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            if word in self.skip:
+                word_id = SKIPPED
+            else:
+                word_id = len(self.words)
+                self.words.append(word)
+            self._word_ids[word] = word_id
+        return word_id
+
+    def find(self, word):
+        """Returns the ID of a word, or None if it has none."""
+        word_id = self._word_ids.get(word)
+        return word_id if word_id is not None and word_id != SKIPPED else None
+
+    def token_ids(self, tokens):
+        """
+        Returns the IDs of a list of raw tokens as an array; tokens that are not
+        counted are SKIPPED.
+        """
+        ids = list(map(self._token_ids.get, tokens))
+        if None in ids:
+            for i, token_id in enumerate(ids):
+                if token_id is None:
+                    ids[i] = self._token_id(tokens[i])
+        return np.array(ids, dtype=np.intp)
+
+    def _token_id(self, token):
+        token_id = self._token_ids.get(token)  # may have been added earlier on the same page
+        if token_id is None:
+            word = self.normalize(token)
+            token_id = self.word_id(word) if word else SKIPPED
+            self._token_ids[token] = token_id
+        return token_id
+
+
+class WordFrequencies(Mapping):
+    """
+    Count of each word of a Vocabulary, as an array indexed by word ID.
+    Iterates in order of first appearance.
+    """
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        self._counts = np.zeros(256, dtype=np.int64)
+
+    @classmethod
+    def from_items(cls, items, skip=frozenset()):
+        """Builds the counts from (word, count) pairs; repeated words add up."""
+        items = list(items)
+        words, counts = zip(*items) if items else ((), ())
+        frequencies = cls(Vocabulary(skip=skip))
+        frequencies.add_counts(words, counts)
+        return frequencies
+
+    @property
+    def words(self):
+        """Words by ID."""
+        return self.vocabulary.words
+
+    @property
+    def counts(self):
+        """Counts by word ID (a view, not a copy)."""
+        return self._counts[:len(self.vocabulary)]
+
+    def _reserve(self):
+        # Grows the counts geometrically so new IDs always have a slot
+        size = len(self.vocabulary)
+        if size > len(self._counts):
+            counts = np.zeros(max(size, 2 * len(self._counts)), dtype=np.int64)
+            counts[:len(self._counts)] = self._counts
+            self._counts = counts
+
+    def add_ids(self, ids):
+        """Counts an array of word IDs; SKIPPED entries are ignored."""
+        ids = ids[ids != SKIPPED]
+        if ids.size:
+            self._reserve()
+            counts = np.bincount(ids)
+            self._counts[:len(counts)] += counts
+
+    def add_tokens(self, tokens):
+        """Counts a list of raw tokens."""
+        self.add_ids(self.vocabulary.token_ids(tokens))
+
+    def add_counts(self, words, counts):
+        """Adds the counts of cleaned words, e.g. a page's Counter or another vocabulary's counts."""
+        ids = np.fromiter(map(self.vocabulary.word_id, words), dtype=np.intp, count=len(words))
+        if not isinstance(counts, np.ndarray):
+            counts = np.fromiter(counts, dtype=np.int64, count=len(ids))
+        kept = ids != SKIPPED
+        self._reserve()
+        np.add.at(self._counts, ids[kept], counts[kept])
+
+    def __getitem__(self, word):
+        word_id = self.vocabulary.find(word)
+        if word_id is None:
+            raise KeyError(word)
+        return int(self._counts[word_id])
+
+    def __contains__(self, word):
+        return self.vocabulary.find(word) is not None
+
+    def __iter__(self):
+        return iter(self.vocabulary.words)
+
+    def __len__(self):
+        return len(self.vocabulary)
+
+    def items(self):
+        return list(zip(self.vocabulary.words, self.counts.tolist()))
+
+    def __repr__(self):
+        return f"WordFrequencies({dict(self.items())!r})"
@@ -1,18 +1,12 @@
-import fitz 
-import re
-
 import difflib
 import os
 import sys
+import threading
+import time
 
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
-from collections import Counter
-from nltk.corpus import wordnet 
-from wordfreq import word_frequency
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from textwrap import wrap
+from assets.instrumentation import Instrumentation
+from assets.mapped_index import open_index
+from assets.search_index import build_fuzzy_index, build_prefix_index
 from kivy.resources import resource_find
 
 
@@ -29,170 +23,71 @@ from kivy.uix.filechooser import FileChooserListView
 from kivy.clock import Clock
 
 
-def extract_pdf_pages(file_path):
-    """
-    Extracts text page-by-page from a PDF file.
+# The analysis pipeline lives in a Kivy-free module. It pulls in fitz, nltk and the
+# frequency data, which take most of a second to import, so it is only loaded on
+# first use (or by warm_up once the window is showing). Its names are still
+# available from this module.
+_ANALYSIS_EXPORTS = {
+    "AnalysisCancelled", "DEFAULT_WORKERS", "PROFICIENCY_SETTINGS", "analyze_pdf", "append_to_common_words_batch",
+    "check_cancelled", "clean_text", "extract_pdf_pages", "get_difficult_word_frequencies",
+    "get_word_definition", "identify_difficult_words", "load_common_words", "proficiency_settings",
+    "report_progress"
+}
 
-    Args:
-        file_path (str): Path to the PDF.
+_warm_up_thread = None
 
-    Returns:
-        list: A list of strings, one per PDF page.
-    """
-    try:
-        doc = fitz.open(file_path)
-        pages = [page.get_text() for page in doc]
-        doc.close()
-        return pages
-    except Exception as e:
-        print(f"Error reading PDF: {e}")
-        return []
-
-def clean_text(text):
-    """
-    Cleans the text by removing punctuation and converting to lowercase.
-    This helps with word matching.
+# Set to "1" to log per-stage timings of each analysis to analysis_profile.jsonl in the
+# app's data directory, or to "ui" to also show them in the output box
+PROFILE_ENV_VAR = "WORD_SEARCH_PROFILE"
 
-    Args:
-        text (str): The text to clean.
+# Set to "1" to fold inflected forms into one entry per lemma ("obfuscated" → "obfuscate")
+GROUP_LEMMAS_ENV_VAR = "WORD_SEARCH_GROUP_LEMMAS"
 
-    Returns:
-        str: The cleaned text.
-    """
-    if text.isdigit() or len(text)<2:
-        return None  # Skip pure numbers
-        
-    text = re.sub(r"'s$", '', text)  # Remove trailing possessive
-    text = re.sub(r'[^\w\s]', '', text)  # Remove punctuation
-    text = re.sub(r'[^A-Za-z]', '', text)  # Remove non-alphabetic characters
+_export_thread = None  # background PDF export, if one is running
 
-    cleaned = text.lower()
-    return cleaned if cleaned else None
+# Candidates of the last analyzed book, for switching its proficiency level without the PDF
+CANDIDATES_FILE = "book_candidates.msgpack"
 
-def get_word_definition(word, definition_cache):
-    """
-    Caching and retrieving word definitions from WordNet.
-    """
-    if word in definition_cache:
-        return definition_cache[word]
-    
-    synsets = wordnet.synsets(word)
-    if synsets:
-        definition = synsets[0].definition()
-        definition_cache[word] = definition
-        return definition
-    else:
-        definition_cache[word] = None
-        return None
 
-def append_to_common_words_batch(words, file_path):
-    """
-    Appends a batch of words to the common words file.
+def __getattr__(name):
+    if name in _ANALYSIS_EXPORTS:
+        return getattr(load_analysis(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    Args:
-        words (list): List of words to append.
-        file_path (str): Path to the file where words will be appended.
-    """
 
-    try:
-        with open(file_path, 'a', encoding='utf-8') as file:
-            # Write all words at once to avoid repeated I/O operations
-            file.writelines(f"{word}\n" for word in words)
-    except Exception as e:
-        print(f"Error writing to file: {e}")
-
-
-def get_difficult_word_frequencies(pages, common_words):
-    """
-    Given the extracted pages, counts the frequency of difficult words not in the common_words list.
+def warm_up(prepare=None):
     """
-    word_frequency = Counter()
-    cleaned_words = set()
-    
-    for page in pages:
-        words = word_tokenize(page) 
-        for raw_word in words:
-            cleaned_word = clean_text(raw_word)  # Clean each word individually
-            if cleaned_word and cleaned_word not in common_words:
-                    word_frequency[cleaned_word] += 1
-                    cleaned_words.add(cleaned_word)
-                
-    return word_frequency,cleaned_words
-
-
-def identify_difficult_words(cleaned_words,word_frequency_dict, local_limit, 
-                             global_freq_limit, common_word_lower_limit,common_words_file_path):
+    Imports the analysis modules and opens the lookup indexes on a background thread,
+    so the first upload does not pay for them.
 
+    Args:
+        prepare (callable, optional): Run first on the same thread, e.g. to set the NLTK data path.
     """
-    Identifies difficult words using both local and global frequency.
-    Appends globally common words to a combined common words file.
-
-    Returns:
-        dict: {word: definition}
-    """
+    global _warm_up_thread
 
+    def run():
+        if prepare:
+            prepare()
+        import assets.analysis
+        from assets.frequency_index import get_global_frequency_index
+        from assets.wordnet_index import get_wordnet_index
+        get_global_frequency_index()
+        get_wordnet_index()
 
-    difficult_words = {}
-    definition_cache = {}
-    new_common_words = []
-    
+    _warm_up_thread = threading.Thread(target=run, daemon=True)
+    _warm_up_thread.start()
 
-    for cleaned_word in cleaned_words:  # Iterate over pre-cleaned words
-        local_freq = word_frequency_dict.get(cleaned_word, 0)
-        
-        if local_freq <= local_limit:
-            # Passed local check → accept
-            definition = get_word_definition(cleaned_word, definition_cache)
-            if definition:
-                difficult_words[cleaned_word] = definition
-        else:
-            # Failed local → check global rank
-            global_freq = word_frequency(cleaned_word, 'en', wordlist='large', minimum=0.0)
-            if global_freq < global_freq_limit:
-                # Word is globally rare → accept
-                definition = get_word_definition(cleaned_word, definition_cache)
-                if definition:
-                    difficult_words[cleaned_word] = definition
-            elif common_word_lower_limit < local_freq:
-                # Word is rejected by wordfreq (i.e., it is common globally)
-                new_common_words.append(cleaned_word)
 
-    # After processing all words, append all common words to the common words file at once
-    if new_common_words:
-        append_to_common_words_batch(new_common_words,common_words_file_path)
+def load_analysis():
+    """Returns the assets.analysis module, waiting for a running warm-up to finish first."""
+    thread = _warm_up_thread
+    if thread is not None and thread is not threading.current_thread():
+        thread.join()
+    import assets.analysis
+    return assets.analysis
 
-    return difficult_words, len(new_common_words)
 
-
-def load_common_words(filepath):
-    """Loads common words from a file into a set.
-
-       Args:
-          filepath (str): Path to the common words file.
-
-       Returns:
-          set: A set of common words.
-    """
-    common_words = set()
-    try:
-        with open(filepath, 'r') as f:
-            for line in f:
-                common_words.add(line.strip())
-    except FileNotFoundError:
-        print(f"Common words file not found at {filepath}. Using a small default list.")
-        #  A very small default list if the file isn't found. For testing.
-        common_words = {"the", "and", "is", "of", "a", "an", "in", "to", "it", 
-                        "that", "was", "he", "she", "for", "on", "are", "with", "as", "I",
-                          "his", "they", "at", "be", "this", "have", "from", "or", "had", "but", "not"}
-    except Exception as e:
-        print(f"Error reading common words file: {e}")
-        common_words = {"the", "and", "is", "of", "a", "an", "in", "to", "it", "that",
-                         "was", "he", "she", "for", "on", "are", "with", "as", "I", "his",
-                           "they", "at", "be", "this", "have", "from", "or", "had", "but", "not"}  # even smaller list
-    return common_words
-
-
-def search_word(entry, output_box, word_definitions):
+def search_word(entry, output_box, word_definitions, fuzzy_index=None):
     word = entry.text.strip().lower()
     # output_box.text = ""  # Clear previous output
 
@@ -200,7 +95,14 @@ def search_word(entry, output_box, word_definitions):
     if definition:
         output_box.text = f"{word}: {definition}"
     else:
-        suggestions = difflib.get_close_matches(word, word_definitions.keys(), n=3)
+        if fuzzy_index is not None:
+            suggestions = fuzzy_index.suggest(word, n=3)
+            if suggestions is None:
+                # The index is catching up with newly loaded definitions; never wait for it here
+                output_box.text = "Word not found. Spelling suggestions are still being indexed, try again in a moment."
+                return
+        else:
+            suggestions = difflib.get_close_matches(word, word_definitions.keys(), n=3)
         if suggestions:
             output_box.text = "Word not found. Did you mean:\n" + "\n".join(
                 f"- {s}: {word_definitions[s]}" for s in suggestions
@@ -209,9 +111,21 @@ def search_word(entry, output_box, word_definitions):
             output_box.text = "Word not found."
 
 
+def definitions_index_path(definitions_path):
+    """Path of the binary definitions index kept next to the text definitions file."""
+    return os.path.splitext(definitions_path)[0] + ".idx"
+
+
 def get_last_book_name(definitions_file="difficult_words_definitions.txt"):
     app_dir = App.get_running_app().user_data_dir
     full_path = os.path.join(app_dir, definitions_file)
+
+    index = open_index(definitions_index_path(full_path))
+    if index is not None:
+        book_name = index.meta.get("book_name")
+        index.close()
+        return book_name or "No book loaded"
+
     try:
         with open(full_path, "r", encoding="utf-8") as f:
             for line in f:
@@ -222,11 +136,39 @@ def get_last_book_name(definitions_file="difficult_words_definitions.txt"):
     return "No book loaded"
 
 
+# The mapped definitions index currently in use; it has to be closed before
+# the file can be replaced or deleted (Windows cannot replace a mapped file)
+_open_definitions = None
+
+
+def close_word_definitions():
+    global _open_definitions
+    if _open_definitions is not None:
+        _open_definitions.close()
+        _open_definitions = None
+
+
 # Function to load word definitions from the file
 def load_word_definitions(file_path="difficult_words_definitions.txt"):
-    word_definitions = {}
+    """
+    Loads the saved definitions. The binary index is memory-mapped and read lazily,
+    so this costs the same for any number of words; the text file is only parsed
+    when no index exists (e.g. data saved by an older version).
+
+    Returns:
+        Mapping: {word: definition}
+    """
+    global _open_definitions
     app_dir = App.get_running_app().user_data_dir
     full_path = os.path.join(app_dir, file_path)
+
+    index = open_index(definitions_index_path(full_path))
+    if index is not None:
+        close_word_definitions()
+        _open_definitions = index
+        return index
+
+    word_definitions = {}
     try:
         with open(full_path, 'r', encoding='utf-8') as file:
             for line in file:
@@ -238,6 +180,27 @@ def load_word_definitions(file_path="difficult_words_definitions.txt"):
     return word_definitions
 
 
+def install_word_definitions(definitions_path, new_index_path):
+    """
+    Replaces the definitions index with a newly written one and opens it.
+    Must run on the UI thread, which owns the currently open index.
+    """
+    close_word_definitions()
+    os.replace(new_index_path, definitions_index_path(definitions_path))
+    return load_word_definitions(os.path.basename(definitions_path))
+
+
+def reopen_word_definitions(definitions_path):
+    """
+    Opens the definitions again after a failed install_word_definitions, which
+    closes the current index first. Returns an empty dict if that fails too.
+    """
+    try:
+        return load_word_definitions(os.path.basename(definitions_path))
+    except Exception:
+        return {}
+
+
 def open_filechooser(upload_callback):
     content = FileChooserListView(filters=["*.pdf"])
     popup = Popup(title="Select PDF file", content=content, size_hint=(0.9, 0.9))
@@ -252,61 +215,166 @@ def open_filechooser(upload_callback):
     popup.open()
 
 
-def upload_and_process_pdf(proficiency_level,pdf_path, output_box, book_label):
-    
-    proficiency_settings = {
-        "Low": {"local_limit": 70, "global_freq_limit": 1e-5, "common_word_lower_limit": 100},
-        "Medium": {"local_limit": 45, "global_freq_limit": 1e-6, "common_word_lower_limit": 75},
-        "High": {"local_limit": 30, "global_freq_limit": 1e-7, "common_word_lower_limit": 40}
-    }
-
-    app_dir = App.get_running_app().user_data_dir
-    common_words_file_path = os.path.join(app_dir, "common_words.txt")
-    try:
-        pages = extract_pdf_pages(pdf_path)
-        common_words = load_common_words(common_words_file_path)
-        word_freq, cleaned_words = get_difficult_word_frequencies(pages, common_words)
-
-        level = proficiency_level  
-        settings = proficiency_settings.get(level, proficiency_settings["Medium"])
+def upload_and_process_pdf(proficiency_level,pdf_path, output_box, book_label, on_complete=None):
+    """
+    Starts the PDF analysis on a background thread so the window stays responsive.
+    Progress is posted to output_box through the Kivy Clock.
 
-        difficult_words, new_common_words_len = identify_difficult_words(
-            cleaned_words=cleaned_words,
-            word_frequency_dict=word_freq,
-            local_limit=settings["local_limit"],
-            global_freq_limit=settings["global_freq_limit"],
-            common_word_lower_limit=settings["common_word_lower_limit"],
-            common_words_file_path=common_words_file_path
-        )
+    Args:
+        on_complete (callable, optional): Called on the UI thread with the new
+            word definitions, or None if the analysis failed or was cancelled.
 
-        book_name = os.path.splitext(os.path.basename(pdf_path))[0]
+    Returns:
+        threading.Event: Set it to cancel the running analysis.
+    """
 
+    app_dir = App.get_running_app().user_data_dir
+    common_words_file_path = os.path.join(app_dir, "common_words.txt")
+    definitions_path = os.path.join(app_dir, "difficult_words_definitions.txt")
+    definition_cache_path = os.path.join(app_dir, "definition_cache.db")
+    page_cache_path = os.path.join(app_dir, "page_cache.db")
+    library_path = os.path.join(app_dir, "library.db")
+    candidates_path = os.path.join(app_dir, CANDIDATES_FILE)
+    new_index_path = definitions_index_path(definitions_path) + ".tmp"
+    cancel_event = threading.Event()
+    profile = os.environ.get(PROFILE_ENV_VAR)
+    instrumentation = Instrumentation() if profile else None
+
+    def show_progress(message):
+        Clock.schedule_once(lambda dt: setattr(output_box, "text", message))
+
+    def finish(word_definitions):
+        if on_complete:
+            on_complete(word_definitions)
+
+    def on_success(book_name, difficult_words, new_common_words_len):
+        try:
+            word_definitions = install_word_definitions(definitions_path, new_index_path)
+        except Exception as e:
+            # The old index was closed for the replace; hand back a freshly opened one
+            on_error(e, reopen_word_definitions(definitions_path))
+            return
         output_lines = []
         if new_common_words_len > 0:
             output_lines.append(f"Appended {new_common_words_len} words to common words.")
         output_lines.append(f"{book_name} analyzed successfully.")
         output_lines.append(f"{len(difficult_words)} difficult words updated.")
-        output_text = "\n".join(output_lines)
-
-        app_dir = App.get_running_app().user_data_dir
-        definitions_path = os.path.join(app_dir, "difficult_words_definitions.txt")
-
-        with open(definitions_path, "w", encoding="utf-8") as def_file:
-            if book_name:
-                def_file.write(f"__book_name__: {book_name}\n")
-            for word, definition in difficult_words.items():
-                def_file.write(f"{word}: {definition}\n")
-
-        word_definitions = load_word_definitions()
+        if profile == "ui":
+            output_lines.append(instrumentation.format_report())
 
         book_label.text = book_name
-        output_box.text = output_text
+        output_box.text = "\n".join(output_lines)
+        finish(word_definitions)
 
-        return word_definitions
+    def on_cancelled():
+        output_box.text = "Analysis cancelled."
+        finish(None)
 
-    except Exception as e:
+    def on_error(e, word_definitions=None):
         book_label.text = "Failed to load book"
         output_box.text = f"Error processing PDF:\n{e}"
+        finish(word_definitions)
+
+    def run():
+        analysis = None
+        try:
+            analysis = load_analysis()
+            settings = analysis.proficiency_settings(proficiency_level)
+            result = analysis.analyze_pdf(pdf_path, settings, common_words_file_path, definitions_path,
+                                          progress=show_progress, cancel_event=cancel_event,
+                                          workers=analysis.DEFAULT_WORKERS,
+                                          definition_cache_path=definition_cache_path,
+                                          definitions_index_path=new_index_path,
+                                          page_cache_path=page_cache_path,
+                                          library_path=library_path,
+                                          instrumentation=instrumentation,
+                                          group_lemmas=os.environ.get(GROUP_LEMMAS_ENV_VAR) == "1",
+                                          candidates_path=candidates_path,
+                                          level=proficiency_level)
+            if instrumentation is not None:
+                instrumentation.write_log(os.path.join(app_dir, "analysis_profile.jsonl"),
+                                          pdf=pdf_path, level=proficiency_level)
+            Clock.schedule_once(lambda dt: on_success(*result))
+        except Exception as e:
+            # Every failure, including the import of the analysis modules, ends the job on the UI thread
+            if analysis is not None and isinstance(e, analysis.AnalysisCancelled):
+                Clock.schedule_once(lambda dt: on_cancelled())
+            else:
+                Clock.schedule_once(lambda dt, e=e: on_error(e))
+
+    output_box.text = "Analyzing PDF..."
+    threading.Thread(target=run, daemon=True).start()
+    return cancel_event
+
+
+def saved_proficiency_level():
+    """
+    Level the last analyzed book's outputs were written at, as saved with its
+    candidates, or None if unknown. Only reads the start of the file.
+    """
+    from assets.candidates import load_candidates_level
+    app_dir = App.get_running_app().user_data_dir
+    return load_candidates_level(os.path.join(app_dir, CANDIDATES_FILE))
+
+
+def apply_proficiency_level(proficiency_level, output_box, on_complete=None):
+    """
+    Re-classifies the last analyzed book at another proficiency level on a background
+    thread, from the candidates saved by its analysis; the PDF is not read again.
+
+    Args:
+        on_complete (callable, optional): Called on the UI thread with the new
+            word definitions, or None if re-classifying failed.
+
+    Returns:
+        bool: False if no analyzed book was saved; the level then applies to the next upload.
+    """
+    app_dir = App.get_running_app().user_data_dir
+    candidates_path = os.path.join(app_dir, CANDIDATES_FILE)
+    if not os.path.exists(candidates_path):
+        return False
+    definitions_path = os.path.join(app_dir, "difficult_words_definitions.txt")
+    definition_cache_path = os.path.join(app_dir, "definition_cache.db")
+    library_path = os.path.join(app_dir, "library.db")
+    new_index_path = definitions_index_path(definitions_path) + ".tmp"
+
+    def finish(word_definitions):
+        if on_complete:
+            on_complete(word_definitions)
+
+    def on_success(book_name, difficult_words, seconds):
+        try:
+            word_definitions = install_word_definitions(definitions_path, new_index_path)
+        except Exception as e:
+            on_error(e, reopen_word_definitions(definitions_path))
+            return
+        output_box.text = (f"{book_name} re-classified at {proficiency_level} level in {seconds * 1000:.0f} ms.\n"
+                           f"{len(difficult_words)} difficult words updated.")
+        finish(word_definitions)
+
+    def on_error(e, word_definitions=None):
+        output_box.text = f"Could not apply the {proficiency_level} level:\n{e}"
+        finish(word_definitions)
+
+    def run():
+        try:
+            analysis = load_analysis()
+            settings = analysis.proficiency_settings(proficiency_level)
+            start = time.perf_counter()
+            book_name, difficult_words = analysis.reclassify_book(
+                candidates_path, settings, definitions_path,
+                definitions_index_path=new_index_path,
+                library_path=library_path,
+                definition_cache_path=definition_cache_path,
+                level=proficiency_level
+            )
+            seconds = time.perf_counter() - start
+            Clock.schedule_once(lambda dt: on_success(book_name, difficult_words, seconds))
+        except Exception as e:
+            Clock.schedule_once(lambda dt, e=e: on_error(e))
+
+    threading.Thread(target=run, daemon=True).start()
+    return True
         
 
 def show_user_manual(output_box):
@@ -317,6 +385,7 @@ def show_user_manual(output_box):
         "   - Low: Highlights most uncommon words.\n"
         "   - Medium: Balanced filtering.\n"
         "   - High: Only very rare words shown.\n"
+        "   Changing the level later re-applies it to the last analyzed book instantly, without uploading it again.\n"
         "3. The app will extract text, identify difficult words using frequency data, and save them.\n"
         "4. You can search for meanings of words using the search bar at the top.\n"
         "5. Click trash button on top left corner to clear previously analyzed data \n"
@@ -324,7 +393,7 @@ def show_user_manual(output_box):
         "7. Your common word list grows smarter based on your interactions.\n"
         "8. Internet is only required during PDF upload for fetching word meanings.Once processed, everything works offline for distraction-free reading.\n"
         "9. For best results, use clean, text-based PDFs (not scanned images or pictures).\n"
-        "10. Each new upload replaces previous analysis—only one book is active at a time.\n"
+        "10. Every analyzed book is kept in your library, and search covers the words of all of them. The downloadable PDF holds the last analyzed book.\n"
         "11. The app is built for Windows, not Android. However, it provides a downloadable, lightweight PDF containing all definitions, which you can open on any Android device and easily search for words within."
 
         f"\n\n{' ' * 15}Tip: Use this app for focused, offline reading without digital distractions."
@@ -355,7 +424,15 @@ def clear_cache(output_box,book_label):
 
                 # Clear definitions file
                 open(definitions_path, "w", encoding="utf-8").close()
-                output_box.text = "Cache cleared.\ncommon_words.txt reset.\nDefinitions emptied."
+                close_word_definitions()
+                index_path = definitions_index_path(definitions_path)
+                library_path = os.path.join(app_dir, "library.db")
+                candidates_path = os.path.join(app_dir, CANDIDATES_FILE)
+                page_cache_path = os.path.join(app_dir, "page_cache.db")
+                for path in (index_path, library_path, candidates_path, page_cache_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+                output_box.text = "Cache cleared.\ncommon_words.txt reset.\nDefinitions, library and page counts emptied."
                 book_label.text = "No book loaded"
         except Exception as e:
             output_box.text = f"Failed to clear cache:\n{e}"
@@ -404,31 +481,10 @@ def clear_cache(output_box,book_label):
     popup.open()
 
 
-def txt_to_pdf(txt_path, pdf_path):
-    with open(txt_path, "r", encoding="utf-8") as file:
-        lines = file.readlines()
-
-    if not any(line.strip() for line in lines):
-        raise ValueError("Text file is empty. PDF will not be created.")
-
-    c = canvas.Canvas(pdf_path, pagesize=A4)
-    width, height = A4
-    margin = 40
-    y = height - margin
-    line_height = 14  # minimal line spacing
-
-    max_chars = 100  # adjust based on font and page width
-
-    for line in lines:
-        wrapped_lines = wrap(line.strip(), width=max_chars)
-        for wline in wrapped_lines:
-            if y < margin:
-                c.showPage()
-                y = height - margin
-            c.drawString(margin, y, wline)
-            y -= line_height
-
-    c.save()
+def txt_to_pdf(txt_path, pdf_path, progress=None):
+    """Exports the definitions file to a PDF; see assets.pdf_export."""
+    from assets.pdf_export import export_definitions_pdf
+    return export_definitions_pdf(txt_path, pdf_path, progress)
 
 
 def get_download_path(filename):
@@ -444,6 +500,12 @@ def get_download_path(filename):
 
 
 def download_file(output_box, book_label):
+    """Exports the definitions PDF on a background thread, reporting progress in output_box."""
+    global _export_thread
+    if _export_thread is not None and _export_thread.is_alive():
+        output_box.text = "PDF export already in progress..."
+        return
+
     app_dir = App.get_running_app().user_data_dir
     txt_path = os.path.join(app_dir, "difficult_words_definitions.txt")
 
@@ -451,12 +513,19 @@ def download_file(output_box, book_label):
     safe_label = "".join(c if c.isalnum() or c in (' ', '_', '-') else "_" for c in book_label.text).strip().replace(" ", "_")
     filename = f"{safe_label}_difficult_words_definitions.pdf"
     pdf_path = get_download_path(filename)
-    try:
-        txt_to_pdf(txt_path, pdf_path)
-        output_box.text = f"PDF saved at {pdf_path}"
-    except ValueError as e:
-        output_box.text = str(e)
-    except Exception as e:
-        output_box.text(f"An unexpected error occurred: {e}")
-    
 
+    def show(message):
+        Clock.schedule_once(lambda dt: setattr(output_box, "text", message))
+
+    def run():
+        try:
+            txt_to_pdf(txt_path, pdf_path, progress=show)
+            show(f"PDF saved at {pdf_path}")
+        except ValueError as e:
+            show(str(e))
+        except Exception as e:
+            show(f"An unexpected error occurred: {e}")
+
+    output_box.text = "Exporting PDF..."
+    _export_thread = threading.Thread(target=run, daemon=True)
+    _export_thread.start()
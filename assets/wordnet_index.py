@@ -0,0 +1,129 @@
+"""
+Precomputed WordNet definitions, so the app never has to load the NLTK WordNet reader.
+
+The build step walks WordNet once and stores, for every lemma and part of speech,
+the definition of its first synset, plus WordNet's morphological exception lists.
+At runtime WordNetIndex.definition(word) repeats what wordnet.synsets(word)[0]
+does (including morphy's inflection handling) with lookups in the mapped file,
+and WordNetIndex.lemma(word) gives the base form that definition belongs to.
+
+Build it after the NLTK data is available:
+
+    python -m assets.wordnet_index
+"""
+import os
+import sys
+import threading
+
+from assets.mapped_index import open_index, write_index
+
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wordnet_definitions.idx")
+
+# Same order as nltk's POS_LIST, which decides which synset comes first
+POS_ORDER = ["n", "v", "a", "r"]
+
+_index = None
+_index_loaded = False
+_index_lock = threading.Lock()
+
+
+def build_wordnet_index(path=DEFAULT_INDEX_PATH):
+    """
+    Builds the definition index from the installed NLTK WordNet corpus.
+
+    Keys are "<pos>:<lemma>" → first definition and "<pos>!<form>" → space
+    separated base forms from the exception lists.
+
+    Returns:
+        int: Number of entries written.
+    """
+    from nltk.corpus import wordnet
+
+    items = []
+    for lemma, offsets_by_pos in wordnet._lemma_pos_offset_map.items():
+        for pos in POS_ORDER:
+            offsets = offsets_by_pos.get(pos)
+            if offsets:
+                synset = wordnet.synset_from_pos_and_offset(pos, offsets[0])
+                items.append((f"{pos}:{lemma}", synset.definition()))
+
+    for pos in POS_ORDER:
+        for form, bases in wordnet._exception_map[pos].items():
+            items.append((f"{pos}!{form}", " ".join(bases)))
+
+    meta = {
+        "wordnet_version": wordnet.get_version(),
+        "substitutions": {pos: wordnet.MORPHOLOGICAL_SUBSTITUTIONS[pos] for pos in POS_ORDER},
+    }
+    tmp_path = path + ".tmp"
+    write_index(tmp_path, items, meta)
+    os.replace(tmp_path, path)
+    return len(items)
+
+
+class WordNetIndex:
+
+    def __init__(self, mapped):
+        self.mapped = mapped
+        self.substitutions = {pos: [tuple(rule) for rule in rules]
+                              for pos, rules in mapped.meta["substitutions"].items()}
+
+    def _candidate_forms(self, word, pos):
+        # Mirrors WordNetCorpusReader._morphy: the word itself, then either its
+        # exception-list base forms or the suffix substitutions for this pos
+        bases = self.mapped.get(f"{pos}!{word}")
+        if bases is not None:
+            forms = bases.split(" ")
+        else:
+            forms = [word[:-len(old)] + new for old, new in self.substitutions[pos] if word.endswith(old)]
+        return [word] + forms
+
+    def _first_entry(self, word):
+        # The (form, definition) of wordnet.synsets(word)[0], or (None, None)
+        word = word.lower()
+        get = self.mapped.get
+        for pos in POS_ORDER:
+            for form in self._candidate_forms(word, pos):
+                definition = get(f"{pos}:{form}")
+                if definition is not None:
+                    return form, definition
+        return None, None
+
+    def definition(self, word):
+        """
+        Returns the same definition as wordnet.synsets(word)[0].definition(),
+        or None if WordNet has no synset for the word.
+        """
+        return self._first_entry(word)[1]
+
+    def lemma(self, word):
+        """
+        Returns the base form the definition of the word belongs to, the same as
+        wordnet.morphy(word) ("obfuscated" → "obfuscate"), or None if WordNet has
+        no synset for the word.
+        """
+        return self._first_entry(word)[0]
+
+
+def get_wordnet_index(path=DEFAULT_INDEX_PATH):
+    """
+    Returns the process-wide WordNetIndex, or None if the index has not been built.
+    """
+    global _index, _index_loaded
+    with _index_lock:
+        if not _index_loaded:
+            mapped = open_index(path)
+            _index = WordNetIndex(mapped) if mapped is not None else None
+            _index_loaded = True
+        return _index
+
+
+if __name__ == "__main__":
+    output = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_INDEX_PATH
+    nltk_data = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nltk_data")
+    if os.path.exists(nltk_data):
+        import nltk
+        nltk.data.path.insert(0, nltk_data)
+    count = build_wordnet_index(output)
+    print(f"Wrote {count} entries to {output}")
@@ -0,0 +1,203 @@
+"""
+Headless batch analysis: runs the same pipeline as the app over many PDFs, without Kivy.
+
+Usage:
+    python batch.py books/ "more/**/*.pdf" single.pdf --out results --level Medium --jobs 4
+
+Writes one definitions file per book to the output directory (same format as the
+app's difficult_words_definitions.txt) and a summary.json with per-book timings.
+Books are analyzed in parallel worker processes and share the common words file,
+the definition cache and the page cache in the output directory.
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import as_completed
+
+from assets.analysis import (DEFAULT_WORKERS, PROFICIENCY_SETTINGS, PdfPages, analyze_pdf, proficiency_settings,
+                             worker_pool)
+from assets.instrumentation import Instrumentation
+from assets.nltk_bootstrap import ensure_nltk_data
+from assets.tokenizers import TOKENIZERS, tokenizer_name
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BUNDLED_COMMON_WORDS = os.path.join(ROOT, "assets", "combined_common_words.txt")
+NLTK_DATA_DIR = os.path.join(ROOT, "assets", "nltk_data")
+
+
+def find_pdfs(inputs):
+    """
+    Expands directories (searched recursively), glob patterns and plain paths into PDF files.
+
+    Returns:
+        list: Absolute paths, without duplicates, in the order given.
+    """
+    found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(glob.glob(os.path.join(item, "**", "*.pdf"), recursive=True))
+        elif glob.has_magic(item):
+            matches = sorted(glob.glob(item, recursive=True))
+        else:
+            matches = [item]
+        found.extend(os.path.abspath(path) for path in matches if path.lower().endswith(".pdf"))
+    return list(dict.fromkeys(found))
+
+
+def output_paths(pdf_paths, out_dir):
+    """Maps each PDF to its definitions file; books with the same name get a numbered suffix."""
+    paths = {}
+    used = set()
+    for pdf_path in pdf_paths:
+        book_name = os.path.splitext(os.path.basename(pdf_path))[0]
+        name, suffix = book_name, 1
+        while name.lower() in used:
+            suffix += 1
+            name = f"{book_name}-{suffix}"
+        used.add(name.lower())
+        paths[pdf_path] = os.path.join(out_dir, f"{name}.txt")
+    return paths
+
+
+def analyze_book(pdf_path, definitions_path, settings, out_dir, workers, library_path, profile=False,
+                 tokenizer=None, group_lemmas=False):
+    """
+    Analyzes one PDF. Runs in a worker process.
+
+    Returns:
+        dict: Summary entry for the book; errors are reported in it instead of raised.
+    """
+    entry = {"pdf": pdf_path, "output": definitions_path}
+    instrumentation = Instrumentation() if profile else None
+    start = time.perf_counter()
+    try:
+        entry["pages"] = len(PdfPages(pdf_path))
+        book_name, difficult_words, new_common_words_len = analyze_pdf(
+            pdf_path, settings,
+            common_words_file_path=os.path.join(out_dir, "common_words.txt"),
+            definitions_path=definitions_path,
+            workers=workers,
+            definition_cache_path=os.path.join(out_dir, "definition_cache.db"),
+            page_cache_path=os.path.join(out_dir, "page_cache.db"),
+            library_path=library_path,
+            instrumentation=instrumentation,
+            tokenizer=tokenizer,
+            group_lemmas=group_lemmas
+        )
+        entry.update(status="ok", book_name=book_name, difficult_words=len(difficult_words),
+                     new_common_words=new_common_words_len)
+    except Exception as e:
+        entry.update(status="error", error=f"{type(e).__name__}: {e}")
+    entry["seconds"] = round(time.perf_counter() - start, 3)
+    if instrumentation is not None:
+        entry["profile"] = instrumentation.report()
+    return entry
+
+
+def run_batch(pdf_paths, out_dir, level="Medium", jobs=DEFAULT_WORKERS, library_path=None, profile=False,
+              tokenizer=None, group_lemmas=False, log=print):
+    """
+    Analyzes every PDF and writes summary.json to out_dir.
+
+    Args:
+        pdf_paths (list): PDFs to analyze.
+        out_dir (str): Output directory; created if missing.
+        level (str): Proficiency level, one of PROFICIENCY_SETTINGS.
+        jobs (int): Books analyzed at the same time. With a single job the pages of
+            each book are counted in parallel instead.
+        library_path (str, optional): Also add every book to this library file.
+        profile (bool): Add per-stage timings and counters of each book to the summary.
+        tokenizer (str, optional): Tokenizer backend, see assets.tokenizers.
+        group_lemmas (bool): Fold inflected forms into one entry per lemma.
+        log (callable): Receives one line per finished book.
+
+    Returns:
+        dict: The summary that was written.
+    """
+    import nltk
+
+    os.makedirs(out_dir, exist_ok=True)
+    common_words_path = os.path.join(out_dir, "common_words.txt")
+    if not os.path.exists(common_words_path):
+        shutil.copy(BUNDLED_COMMON_WORDS, common_words_path)
+
+    settings = proficiency_settings(level)
+    tokenizer = tokenizer_name(tokenizer)
+    outputs = output_paths(pdf_paths, out_dir)
+    jobs = max(1, min(jobs, len(pdf_paths) or 1))
+    workers = DEFAULT_WORKERS if jobs == 1 else 1
+
+    start = time.perf_counter()
+    books = []
+    with worker_pool(jobs) as executor:
+        futures = [executor.submit(analyze_book, pdf_path, outputs[pdf_path], settings,
+                                   out_dir, workers, library_path, profile, tokenizer, group_lemmas)
+                   for pdf_path in pdf_paths]
+        for future in as_completed(futures):
+            entry = future.result()
+            books.append(entry)
+            detail = (f"{entry['difficult_words']} words" if entry["status"] == "ok" else entry["error"])
+            log(f"[{len(books)}/{len(pdf_paths)}] {os.path.basename(entry['pdf'])}: "
+                f"{entry['status']}, {detail}, {entry['seconds']:.2f}s")
+
+    books.sort(key=lambda entry: pdf_paths.index(entry["pdf"]))
+    total_seconds = time.perf_counter() - start
+    total_pages = sum(entry.get("pages", 0) for entry in books)
+    summary = {
+        "level": level,
+        "settings": settings,
+        "jobs": jobs,
+        "tokenizer": tokenizer,
+        "group_lemmas": group_lemmas,
+        "books_ok": sum(entry["status"] == "ok" for entry in books),
+        "books_failed": sum(entry["status"] != "ok" for entry in books),
+        "total_pages": total_pages,
+        "total_seconds": round(total_seconds, 3),
+        "pages_per_second": round(total_pages / total_seconds, 2) if total_seconds else None,
+        "books": books,
+    }
+    with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze PDFs without the UI.")
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories or glob patterns")
+    parser.add_argument("--out", default="batch_output", help="output directory (default: batch_output)")
+    parser.add_argument("--level", default="Medium", choices=list(PROFICIENCY_SETTINGS),
+                        help="proficiency level (default: Medium)")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_WORKERS,
+                        help=f"books analyzed in parallel (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--library", help="also add the books to this library file")
+    parser.add_argument("--tokenizer", choices=list(TOKENIZERS),
+                        help="tokenizer backend (default: $WORD_SEARCH_TOKENIZER, else nltk)")
+    parser.add_argument("--group-lemmas", action="store_true",
+                        help="count inflected forms as their lemma (obfuscated, obfuscating → obfuscate)")
+    parser.add_argument("--offline", action="store_true", help="never download NLTK data")
+    parser.add_argument("--profile", action="store_true",
+                        help="include per-stage timings and counters of each book in the summary")
+    args = parser.parse_args(argv)
+
+    pdf_paths = find_pdfs(args.inputs)
+    if not pdf_paths:
+        parser.error("no PDF files found")
+
+    missing = ensure_nltk_data(NLTK_DATA_DIR, allow_download=not args.offline, progress=print)
+    if missing:
+        print(f"Warning: NLTK data missing: {', '.join(missing)}", file=sys.stderr)
+
+    summary = run_batch(pdf_paths, args.out, args.level, args.jobs, args.library, args.profile,
+                        args.tokenizer, args.group_lemmas)
+    print(f"{summary['books_ok']} books analyzed, {summary['books_failed']} failed, "
+          f"{summary['total_seconds']:.2f}s. Summary: {os.path.join(args.out, 'summary.json')}")
+    return 1 if summary["books_failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Micro-benchmark: clean_text against normalize_token on the token stream of a real PDF.
+
+Usage:
+    python benchmarks/bench_normalizer.py path/to/book.pdf [repeats]
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import nltk
+from nltk.tokenize import word_tokenize
+
+from assets.analysis import clean_text, extract_pdf_pages, normalize_token
+
+
+def time_cleaner(cleaner, tokens, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for token in tokens:
+            cleaner(token)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    pdf_path = sys.argv[1]
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    nltk_data = os.path.join(ROOT, "assets", "nltk_data")
+    if os.path.exists(nltk_data):
+        nltk.data.path.insert(0, nltk_data)
+
+    tokens = [token for page in extract_pdf_pages(pdf_path) for token in word_tokenize(page)]
+    mismatches = sum(1 for token in set(tokens) if clean_text(token) != normalize_token(token))
+
+    normalize_token.cache_clear()
+    old = time_cleaner(clean_text, tokens, repeats)
+    new = time_cleaner(normalize_token, tokens, repeats)
+
+    print(f"tokens:          {len(tokens)} ({len(set(tokens))} distinct)")
+    print(f"mismatches:      {mismatches}")
+    print(f"clean_text:      {old:.3f}s ({len(tokens) / old:,.0f} tokens/s)")
+    print(f"normalize_token: {new:.3f}s ({len(tokens) / new:,.0f} tokens/s)")
+    print(f"speedup:         {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+End-to-end benchmark of the analysis pipeline on synthetic PDFs.
+
+Generates reproducible PDFs of the requested sizes (cached in --pdf-dir), then
+times every stage on its own and the whole analysis end to end. What a stage
+needs (extracted pages, word counts, a finished analysis) is prepared in one
+fresh process and the stage is measured in another, so peak RSS is the
+stage's own (plus the interpreter and the imports it needs):
+
+    extract          extract_pdf_pages
+    count            get_difficult_word_frequencies (pages extracted beforehand)
+    identify         identify_difficult_words (words counted beforehand)
+    load_definitions opening the saved definitions index (what load_word_definitions does)
+    search           search_word for 1000 hits and misses
+    export           txt_to_pdf
+    end_to_end       analyze_pdf without caches
+    end_to_end_warm  analyze_pdf again with a warm page count and definition cache
+
+extract, count and the end-to-end runs are repeated for every --workers value,
+so serial and parallel extraction and counting can be compared. Results are printed as JSON.
+
+Usage:
+    python benchmarks/bench_pipeline.py --pages 10 200 2000 --workers 1 4 --out results.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import pickle
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The search and export stages import Kivy; keep it from parsing our arguments
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+
+COMMON_WORDS_PATH = os.path.join(ROOT, "assets", "combined_common_words.txt")
+WORDS_PER_PAGE = 300
+RARE_WORD_SHARE = 0.08
+SEARCHES = 1000
+
+
+def rare_vocabulary(count, seed):
+    """Real words with a global frequency between 1e-5 and 1e-7, like the ones the app looks for."""
+    from assets.frequency_index import read_frequency_buckets
+
+    buckets = read_frequency_buckets()
+    words = [word for bucket in buckets[500:700] for word in bucket if word.isascii() and word.isalpha()]
+    words.sort()
+    return random.Random(seed).sample(words, min(count, len(words)))
+
+
+def make_synthetic_pdf(path, pages, seed, words_per_page=WORDS_PER_PAGE):
+    """
+    Writes a PDF of Zipf-distributed common words mixed with globally rare ones.
+    The same pages and seed always give the same text.
+    """
+    import fitz
+
+    rng = random.Random(seed)
+    with open(COMMON_WORDS_PATH, encoding="utf-8") as f:
+        common = [line.strip() for line in f if line.strip()]
+    weights = [1 / rank for rank in range(1, len(common) + 1)]
+    rare = rare_vocabulary(2000, seed)
+
+    doc = fitz.open()
+    for _ in range(pages):
+        words = rng.choices(common, weights, k=words_per_page)
+        for i in range(words_per_page):
+            if rng.random() < RARE_WORD_SHARE:
+                words[i] = rng.choice(rare)
+        text = " ".join(words).capitalize() + "."
+        doc.new_page().insert_textbox(fitz.Rect(40, 40, 560, 800), text, fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def synthetic_pdf(pdf_dir, pages, seed):
+    path = os.path.join(pdf_dir, f"synthetic_{pages}p_seed{seed}.pdf")
+    if not os.path.exists(path):
+        make_synthetic_pdf(path, pages, seed)
+    return path
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and its finished children, or None on Windows."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KiB on Linux
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return round(peak * scale / (1 << 20), 1)
+
+
+def _setup_nltk():
+    import nltk
+    nltk_data = os.path.join(ROOT, "assets", "nltk_data")
+    if os.path.exists(nltk_data):
+        nltk.data.path.insert(0, nltk_data)
+
+
+def _settings():
+    from assets.analysis import proficiency_settings
+    return proficiency_settings("Medium")
+
+
+def _copy_common_words(work_dir):
+    path = os.path.join(work_dir, "common_words.txt")
+    shutil.copy(COMMON_WORDS_PATH, path)
+    return path
+
+
+def _run_analysis(pdf_path, workers, work_dir, caches=False):
+    from assets import analysis
+
+    kwargs = {}
+    if caches:
+        kwargs = {"page_cache_path": os.path.join(work_dir, "page_cache.db"),
+                  "definition_cache_path": os.path.join(work_dir, "definition_cache.db")}
+    analysis.analyze_pdf(pdf_path, _settings(), _copy_common_words(work_dir),
+                         os.path.join(work_dir, "definitions.txt"), workers=workers,
+                         definitions_index_path=os.path.join(work_dir, "definitions.idx"), **kwargs)
+
+
+def _prepare_stage(stage, pdf_path, work_dir):
+    """
+    Runs in its own process before a measurement and leaves what the stage
+    needs in work_dir, so the measured process's peak RSS is the stage's own.
+    """
+    _setup_nltk()
+    from assets import analysis
+    from assets.common_words import open_common_words
+
+    if stage in ("count", "identify"):
+        pages = analysis.extract_pdf_pages(pdf_path)
+        if stage == "count":
+            prepared = pages
+        else:
+            prepared = analysis.get_difficult_word_frequencies(
+                pages, open_common_words(_copy_common_words(work_dir)))
+        with open(os.path.join(work_dir, "prepared.pickle"), "wb") as f:
+            pickle.dump(prepared, f)
+    elif stage in ("load_definitions", "search", "export"):
+        _run_analysis(pdf_path, 1, work_dir)
+    elif stage == "end_to_end_warm":
+        _run_analysis(pdf_path, 1, work_dir, caches=True)
+        # Touching the file makes it a different version, so the measured run
+        # re-reads and hashes the pages but does not tokenize them again
+        os.utime(pdf_path)
+
+
+def _load_prepared(work_dir):
+    with open(os.path.join(work_dir, "prepared.pickle"), "rb") as f:
+        return pickle.load(f)
+
+
+def _run_stage(stage, pdf_path, workers, work_dir):
+    """
+    Runs one measurement in a fresh worker process, after _prepare_stage has
+    run in another one. Loading its results happens before the clock starts.
+
+    Returns:
+        dict: {"seconds", "peak_rss_mb"}
+    """
+    _setup_nltk()
+    from assets import analysis
+    from assets.common_words import open_common_words
+
+    settings = _settings()
+    definitions_path = os.path.join(work_dir, "definitions.txt")
+    index_path = os.path.join(work_dir, "definitions.idx")
+
+    if stage == "extract":
+        start = time.perf_counter()
+        analysis.extract_pdf_pages(pdf_path, workers=workers)
+
+    elif stage == "count":
+        pages = _load_prepared(work_dir)
+        common_words = open_common_words(_copy_common_words(work_dir))
+        start = time.perf_counter()
+        analysis.get_difficult_word_frequencies(pages, common_words, workers=workers)
+
+    elif stage == "identify":
+        word_freq, cleaned_words = _load_prepared(work_dir)
+        common_words_path = os.path.join(work_dir, "common_words.txt")
+        start = time.perf_counter()
+        analysis.identify_difficult_words(cleaned_words, word_freq, settings["local_limit"],
+                                          settings["global_freq_limit"], settings["common_word_lower_limit"],
+                                          common_words_path)
+
+    elif stage in ("load_definitions", "search", "export"):
+        from types import SimpleNamespace
+        import assets.word_search as ws
+        from assets.mapped_index import open_index
+        from assets.search_index import FuzzyIndex
+
+        if stage == "load_definitions":
+            start = time.perf_counter()
+            open_index(index_path).close()
+        elif stage == "search":
+            definitions = open_index(index_path)
+            fuzzy_index = FuzzyIndex(list(definitions))
+            rng = random.Random(0)
+            words = list(definitions) or ["none"]
+            queries = [rng.choice(words) if i % 2 else rng.choice(words)[::-1] for i in range(SEARCHES)]
+            output_box = SimpleNamespace(text="")
+            start = time.perf_counter()
+            for query in queries:
+                ws.search_word(SimpleNamespace(text=query), output_box, definitions, fuzzy_index)
+        else:
+            start = time.perf_counter()
+            ws.txt_to_pdf(definitions_path, os.path.join(work_dir, "export.pdf"))
+
+    elif stage == "end_to_end":
+        start = time.perf_counter()
+        _run_analysis(pdf_path, workers, work_dir)
+
+    elif stage == "end_to_end_warm":
+        start = time.perf_counter()
+        _run_analysis(pdf_path, workers, work_dir, caches=True)
+
+    else:
+        raise ValueError(f"unknown stage {stage}")
+
+    return {"seconds": round(time.perf_counter() - start, 4), "peak_rss_mb": peak_rss_mb()}
+
+
+def _in_new_process(function, *args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(function, *args).result()
+
+
+def measure(stage, pdf_path, workers, repeats):
+    """Best of `repeats` runs, each prepared in one new process and measured in another."""
+    best = None
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as work_dir:
+            _in_new_process(_prepare_stage, stage, pdf_path, work_dir)
+            result = _in_new_process(_run_stage, stage, pdf_path, workers, work_dir)
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def count_tokens(pdf_path):
+    _setup_nltk()
+    from assets.analysis import extract_pdf_pages
+    from nltk.tokenize import word_tokenize
+    return sum(len(word_tokenize(page)) for page in extract_pdf_pages(pdf_path))
+
+
+STAGES = ["extract", "count", "identify", "load_definitions", "search", "export", "end_to_end", "end_to_end_warm"]
+WORKER_STAGES = {"extract", "count", "end_to_end", "end_to_end_warm"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 500], help="PDF sizes (10-2000)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1],
+                        help="worker counts for extract, count and end_to_end")
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--repeats", type=int, default=1, help="best of this many runs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--pdf-dir", default=os.path.join(tempfile.gettempdir(), "word_search_bench"),
+                        help="where the synthetic PDFs are cached")
+    parser.add_argument("--out", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    os.makedirs(args.pdf_dir, exist_ok=True)
+    results = []
+    for pages in args.pages:
+        if not 10 <= pages <= 2000:
+            parser.error("--pages must be between 10 and 2000")
+        pdf_path = synthetic_pdf(args.pdf_dir, pages, args.seed)
+        tokens = count_tokens(pdf_path)
+        for stage in args.stages:
+            for workers in (args.workers if stage in WORKER_STAGES else [1]):
+                result = measure(stage, pdf_path, workers, args.repeats)
+                result.update(stage=stage, pages=pages, workers=workers, tokens=tokens)
+                if stage in ("extract", "count", "end_to_end", "end_to_end_warm"):
+                    result["tokens_per_second"] = round(tokens / result["seconds"]) if result["seconds"] else None
+                results.append(result)
+                print(f"{stage:<17}{pages:>6} pages  {workers:>2} workers  {result['seconds']:>9.3f}s  "
+                      f"{result['peak_rss_mb']} MB", file=sys.stderr)
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {"seed": args.seed, "words_per_page": WORDS_PER_PAGE, "repeats": args.repeats},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
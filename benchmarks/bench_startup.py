@@ -0,0 +1,56 @@
+"""
+Startup benchmark: import time of main.py, measured with python -X importtime.
+
+Lists which of the heavy analysis dependencies were imported before the window
+could open; after the lazy-import change none of them should appear.
+
+Usage:
+    python benchmarks/bench_startup.py [repeats]
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["fitz", "nltk", "wordfreq", "reportlab", "marisa_trie", "assets.analysis"]
+
+
+def measure_imports():
+    """Runs `import main` in a fresh interpreter and returns {module: cumulative microseconds}."""
+    env = dict(os.environ, KIVY_NO_ARGS="1", KIVY_NO_CONSOLELOG="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    runs = [measure_imports() for _ in range(repeats)]
+    best = min(runs, key=lambda times: times["main"])
+
+    print(f"import main:     {best['main'] / 1000:.1f} ms (best of {repeats})")
+    loaded = [name for name in HEAVY_MODULES if name in best]
+    if loaded:
+        for name in loaded:
+            print(f"  {name:<17}{best[name] / 1000:.1f} ms")
+    else:
+        print("heavy modules:   none imported at startup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Compares the tokenizer backends on real PDFs: how far their word counts diverge
+from NLTK's word_tokenize, and how much faster they count.
+
+Divergence is measured on what the analysis actually uses, the cleaned word
+counts: the share of word occurrences that would have to change to turn one
+backend's counts into NLTK's, over all words and over the candidate words only
+(those not in the bundled common words list). Timings are tokenizing plus
+cleaning, best of the given repeats.
+
+Usage:
+    python benchmarks/bench_tokenizers.py book.pdf other.pdf --repeats 3 --max-divergence 0.01
+
+With --max-divergence the script exits with status 1 if any backend diverges more
+than that on the candidate words, so it can serve as an equivalence check.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import nltk
+
+from assets.analysis import count_page_tokens, extract_pdf_pages, normalize_token
+from assets.common_words import DEFAULT_COMMON_WORDS
+from assets.tokenizers import DEFAULT_TOKENIZER, TOKENIZERS
+
+COMMON_WORDS_PATH = os.path.join(ROOT, "assets", "combined_common_words.txt")
+EXAMPLES = 10
+
+
+def count_words(pages, tokenizer):
+    word_frequency = Counter()
+    tokens = 0
+    for page in pages:
+        page_frequency, page_tokens = count_page_tokens(page, tokenizer)
+        word_frequency.update(page_frequency)
+        tokens += page_tokens
+    return word_frequency, tokens
+
+
+def time_tokenizer(pages, tokenizer, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        normalize_token.cache_clear()
+        start = time.perf_counter()
+        count_words(pages, tokenizer)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def divergence(reference, other):
+    """Share of the reference's word occurrences that differ in the other counts."""
+    total = sum(reference.values())
+    if not total:
+        return 0.0
+    changed = sum(((reference - other) + (other - reference)).values())
+    return changed / (2 * total)
+
+
+def differences(reference, other):
+    """The words counted most differently, as (word, reference count, other count)."""
+    words = set(reference) | set(other)
+    diffs = sorted(words, key=lambda word: -abs(reference[word] - other[word]))
+    return [(word, reference[word], other[word]) for word in diffs[:EXAMPLES]
+            if reference[word] != other[word]]
+
+
+def load_common_words():
+    if not os.path.exists(COMMON_WORDS_PATH):
+        return DEFAULT_COMMON_WORDS
+    with open(COMMON_WORDS_PATH, encoding="utf-8") as f:
+        return frozenset(line.strip() for line in f if line.strip())
+
+
+def compare(pdf_path, common_words, repeats):
+    """Prints the comparison for one PDF; returns the worst candidate word divergence."""
+    pages = extract_pdf_pages(pdf_path)
+    counts = {name: count_words(pages, name) for name in TOKENIZERS}
+    reference, reference_tokens = counts[DEFAULT_TOKENIZER]
+    reference_candidates = Counter({w: c for w, c in reference.items() if w not in common_words})
+    reference_time = time_tokenizer(pages, DEFAULT_TOKENIZER, repeats)
+
+    print(f"{os.path.basename(pdf_path)}: {len(pages)} pages, {sum(reference.values())} words, "
+          f"{len(reference)} distinct")
+    print(f"  {DEFAULT_TOKENIZER:<8} {reference_time:8.3f}s  {reference_tokens / reference_time:>12,.0f} tokens/s")
+
+    worst = 0.0
+    for name in TOKENIZERS:
+        if name == DEFAULT_TOKENIZER:
+            continue
+        frequency, tokens = counts[name]
+        candidates = Counter({w: c for w, c in frequency.items() if w not in common_words})
+        seconds = time_tokenizer(pages, name, repeats)
+        all_words = divergence(reference, frequency)
+        candidate_words = divergence(reference_candidates, candidates)
+        worst = max(worst, candidate_words)
+        print(f"  {name:<8} {seconds:8.3f}s  {tokens / seconds:>12,.0f} tokens/s  "
+              f"{reference_time / seconds:5.1f}x faster")
+        print(f"           divergence: {all_words:.3%} of all words, {candidate_words:.3%} of candidate words")
+        print(f"           distinct words only in {DEFAULT_TOKENIZER}: {len(set(reference) - set(frequency))}, "
+              f"only in {name}: {len(set(frequency) - set(reference))}")
+        for word, reference_count, count in differences(reference_candidates, candidates):
+            print(f"             {word!r}: {reference_count} → {count}")
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("pdfs", nargs="+", help="PDF files to compare on")
+    parser.add_argument("--repeats", type=int, default=3, help="best of this many runs")
+    parser.add_argument("--max-divergence", type=float,
+                        help="fail if a backend diverges more than this share on candidate words")
+    args = parser.parse_args()
+
+    nltk_data = os.path.join(ROOT, "assets", "nltk_data")
+    if os.path.exists(nltk_data):
+        nltk.data.path.insert(0, nltk_data)
+
+    common_words = load_common_words()
+    worst = max(compare(pdf_path, common_words, args.repeats) for pdf_path in args.pdfs)
+    if args.max_divergence is not None and worst > args.max_divergence:
+        print(f"Divergence {worst:.3%} exceeds {args.max_divergence:.3%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
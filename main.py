@@ -1,14 +1,19 @@
+import multiprocessing
+
+if __name__ == '__main__':
+    # Worker processes of the frozen app re-run this script; hand them off before Kivy loads
+    multiprocessing.freeze_support()
+
 import os
 import shutil
 import kivy
 import assets.word_search as ws
-import nltk
+from assets.nltk_bootstrap import ensure_nltk_data
 
 from kivy.app import App
+from kivy.clock import Clock
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.dropdown import DropDown
 from kivy.uix.button import Button
-from kivy.core.window import Window
 from kivy.utils import platform
 from kivy.graphics import Color, Rectangle
 from kivy.resources import resource_find
@@ -19,27 +24,34 @@ from kivy.lang import Builder
 
 # kivy.require('1.9.0')
 
-if platform in ('win', 'linux', 'macosx'):
-    # Set window size for desktop
-    Window.size = (700, 600)
-    Window.resizable = False
+# kivy.core.window and kivy.uix.dropdown are imported lazily: importing either opens
+# the window, and worker processes spawned for PDF analysis import this module too.
 
 class RootWidget(BoxLayout):
 
     def __init__(self):
         super(RootWidget, self).__init__()
+        from kivy.uix.dropdown import DropDown
         self.selected_option = 'Medium'
+        self.analysis_job = None  # cancel event of the running PDF analysis
+        self.applied_level = ws.saved_proficiency_level()  # level the current book was classified at, if known
+        self.reclassifying = False  # a level change is being applied to the current book
+        self.fuzzy_index = None
         self.create_dropdown() # User Proficiency Dropdown
         self.suggestion_dropdown = DropDown(auto_dismiss=False) # Create suggestion dropdown
 
 
     def on_kv_post(self, base_widget):
-        self.word_definitions = ws.load_word_definitions()  # Load word definitions
+        self.set_word_definitions(ws.load_word_definitions())  # Load word definitions
         self.ids.entry.bind(text=self.update_search_suggestions)  # Bind text change to update suggestions
         self.ids.entry.bind(on_text_validate=self.on_enter_pressed)
+        from kivy.core.window import Window
         Window.bind(on_key_down=self.handle_key_navigation)
-        self.suggestion_buttons = []  # List to store suggestion buttons
+        self.suggestion_buttons = []  # Buttons currently shown in the suggestion dropdown
         self.highlight_index = 0      # Tracks which suggestion is highlighted
+        self.suggestion_pool = [self.create_suggestion_button() for _ in range(10)]  # Reused on every refresh
+        # Only the last keystroke of a burst queries the index and updates the dropdown
+        self.suggestion_trigger = Clock.create_trigger(self.refresh_search_suggestions, 0.05)
 
         self.is_black_theme = True  # default to black theme
         self.set_theme(self.is_black_theme)
@@ -47,7 +59,14 @@ class RootWidget(BoxLayout):
         
 
 
+    def set_word_definitions(self, word_definitions):
+        self.word_definitions = word_definitions
+        self.prefix_index = ws.build_prefix_index(word_definitions)  # Built once per load for suggestions
+        # "Did you mean" on a miss; kept across loads so only changed words are indexed
+        self.fuzzy_index = ws.build_fuzzy_index(word_definitions, self.fuzzy_index)
+
     def create_dropdown(self):
+        from kivy.uix.dropdown import DropDown
         self.dropdown = DropDown()
         self.dropdown.clear_widgets()
 
@@ -78,6 +97,29 @@ class RootWidget(BoxLayout):
         self.ids.proficiency_level.text = self.selected_option
         self.dropdown.dismiss()
         self.update_highlight()
+        self.apply_selected_level()
+
+    def apply_selected_level(self):
+        # Re-classifies the current book at the selected level without re-reading the PDF.
+        # A running analysis or level change picks up the new level when it finishes.
+        if self.analysis_job is not None or self.reclassifying:
+            return
+        if self.selected_option == self.applied_level:
+            return
+        level = self.selected_option
+        self.reclassifying = ws.apply_proficiency_level(
+            level, self.ids.output_box, on_complete=lambda definitions: self.on_level_applied(level, definitions)
+        )
+
+    def on_level_applied(self, level, new_word_definitions):
+        self.reclassifying = False
+        if new_word_definitions is not None:
+            self.set_word_definitions(new_word_definitions)
+        # The saved level is what the outputs were written at, whether or not this worked
+        self.applied_level = ws.saved_proficiency_level()
+        if self.applied_level == level:
+            # The selection may have changed again meanwhile; a failure is not retried
+            self.apply_selected_level()
 
     def update_highlight(self):
         for widget in self.dropdown.container.children:
@@ -144,10 +186,11 @@ class RootWidget(BoxLayout):
         return ws.get_last_book_name()
 
     def search_word(self):
-        ws.search_word(self.ids.entry, self.ids.output_box, self.word_definitions)
+        ws.search_word(self.ids.entry, self.ids.output_box, self.word_definitions, self.fuzzy_index)
 
     def clear_cache(self):
-        self.word_definitions = {}
+        self.set_word_definitions({})
+        self.applied_level = None
         return ws.clear_cache(self.ids.output_box, self.ids.book_label)
         
 
@@ -155,16 +198,32 @@ class RootWidget(BoxLayout):
         return ws.show_user_manual(self.ids.output_box)
 
     def upload_callback(self, pdf_path):
-        new_word_definitions = ws.upload_and_process_pdf(
+        self.ids.upload_button.text = "Cancel"
+        self.analysis_job = ws.upload_and_process_pdf(
             self.ids.proficiency_level.text,
             pdf_path,
             self.ids.output_box,
-            self.ids.book_label
+            self.ids.book_label,
+            on_complete=self.on_analysis_complete
         )
-        if new_word_definitions: 
-            self.word_definitions = new_word_definitions
+
+    def on_analysis_complete(self, new_word_definitions):
+        self.analysis_job = None
+        self.ids.upload_button.text = "Upload PDF"
+        if new_word_definitions is not None:
+            self.set_word_definitions(new_word_definitions)
+            self.applied_level = ws.saved_proficiency_level()
+            # The level may have been changed while the book was being analyzed
+            self.apply_selected_level()
 
     def select_pdf(self):
+        if self.reclassifying:
+            return  # Both write the definitions index; the level change takes milliseconds
+        if self.analysis_job is not None:
+            # The upload button doubles as a cancel button while a book is being analyzed
+            self.analysis_job.set()
+            self.ids.output_box.text = "Cancelling analysis..."
+            return
         return ws.open_filechooser(self.upload_callback) 
         # passing a callback function — self.upload_callback to be called later with the pdf path which
         # then call the function to process that process the pdf
@@ -200,42 +259,53 @@ class RootWidget(BoxLayout):
 
     def apply_selected_suggestion(self, word):
         self.ids.entry.text = word
-        self.suggestion_dropdown.dismiss()
+        self.suggestion_trigger.cancel()  # Keep the dropdown closed after picking a word
+        self.hide_search_suggestions()
         self.search_word()
 
-    
+
+    def create_suggestion_button(self):
+        btn = Button(
+            size_hint_y=None,
+            height=40,
+            halign='left',
+            background_normal='',
+            background_color=(0, 0, 0, 1),
+            color=(1, 1, 1, 1),
+            padding=(10, 10),
+            bold=True
+        )
+        btn.bind(width=lambda instance, value: setattr(instance, 'text_size', (value, None)))
+        btn.bind(on_release=lambda instance: self.apply_selected_suggestion(instance.text))
+        return btn
+
     def update_search_suggestions(self, instance, text):
+        # Restarts the 50 ms countdown on every keystroke
+        self.suggestion_trigger()
+
+    def hide_search_suggestions(self):
         self.suggestion_dropdown.dismiss()
-        self.suggestion_dropdown = DropDown(auto_dismiss=False)
         self.suggestion_buttons = []
         self.highlight_index = 0
 
-        typed_word = text.strip().lower()
-        if not typed_word:
+    def refresh_search_suggestions(self, dt):
+        typed_word = self.ids.entry.text.strip().lower()
+        matches = self.prefix_index.complete(typed_word, len(self.suggestion_pool)) if typed_word else []
+        if not matches:
+            self.hide_search_suggestions()
             return
 
-        matches = [w for w in self.word_definitions if w.startswith(typed_word)]
-        for word in matches[:10]:
-            btn = Button(
-                text=word,
-                size_hint_y=None,
-                height=40,
-                halign='left',
-                background_normal='',
-                background_color=(0, 0, 0, 1),
-                color=(1, 1, 1, 1),
-                padding=(10, 10),
-                bold=True
-            )
-            btn.bind(width=lambda instance, value: setattr(instance, 'text_size', (value, None)))
-            btn.bind(on_release=lambda btn, word=word: self.apply_selected_suggestion(word))
+        self.suggestion_dropdown.clear_widgets()
+        self.suggestion_buttons = self.suggestion_pool[:len(matches)]
+        for btn, word in zip(self.suggestion_buttons, matches):
+            btn.text = word
             self.suggestion_dropdown.add_widget(btn)
-            self.suggestion_buttons.append(btn)
 
-        if matches:
-            self.highlight_suggestion(0)
+        self.highlight_index = 0
+        self.highlight_suggestion(0)
+        if self.suggestion_dropdown.attach_to is None:
             self.suggestion_dropdown.open(self.ids.entry) # Anchor to entry
-            self.suggestion_dropdown.width = self.ids.entry.width
+        self.suggestion_dropdown.width = self.ids.entry.width
 
     def copy_common_words_if_missing(self):
         app_dir = App.get_running_app().user_data_dir
@@ -269,33 +339,54 @@ class RootWidget(BoxLayout):
 #             nltk.download(package_name)
 
 
-def setup_nltk_path():
+def setup_nltk_path(status=None):
+    """
+    Makes the NLTK data available, offline first: data already on disk is used
+    as is, then a local mirror (WORD_SEARCH_NLTK_MIRROR), then a download.
+    Runs on the warm-up thread, so the window and saved definitions are usable meanwhile.
+    """
     base_path = os.path.abspath("assets/nltk_data")
-    if os.path.exists(base_path):
-        nltk.data.path.insert(0, base_path)
-        print(f"NLTK data path set to: {base_path}")
+    reported = []
+
+    def report(message):
+        reported.append(message)
+        if status:
+            status(message)
+
+    missing = ensure_nltk_data(base_path, progress=report)
+    if missing:
+        print(f"NLTK data missing: {', '.join(missing)}")
+        if status:
+            status(
+                "> Language data could not be loaded (" + ", ".join(missing) + ").\n"
+                "> Saved definitions can still be searched; connect to the internet and restart to analyze a new book."
+            )
     else:
-        print(f"NLTK data folder not found at {base_path}, fallback to downloads")
-        os.makedirs(base_path, exist_ok=True)  # create if missing
-        nltk.download("punkt", download_dir=base_path)
-        nltk.download("wordnet", download_dir=base_path)
-        nltk.download("omw-1.4", download_dir=base_path)
-        nltk.download("punkt_tab", download_dir=base_path)
-        nltk.data.path.insert(0, base_path)  # add after download too
-        print(f"NLTK data downloaded and path set to: {base_path}")
+        print(f"NLTK data path set to: {base_path}")
+        if reported and status:
+            # Replace the last "Downloading ..." message, which would otherwise stay up
+            status("> Language data is ready. Upload a book to begin.")
+    return missing
 
 
 
 class WordSearchApp(App):
 
     def build(self):
+        from kivy.core.window import Window
+        if platform in ('win', 'linux', 'macosx'):
+            # Set window size for desktop
+            Window.size = (700, 600)
+            Window.resizable = False
+
         Builder.load_file('wordsearchapp.kv')  # or load_string if using string
         self.root_widget = RootWidget()  # save root widget instance
         return self.root_widget
     
     def on_start(self):
         self.root.copy_common_words_if_missing()
-        setup_nltk_path()
+        # nltk, fitz and the frequency data load in the background once the first frame is up
+        Clock.schedule_once(lambda dt: ws.warm_up(prepare=lambda: setup_nltk_path(self.show_status)))
 
         if self.root.ids.book_label.text == "No book loaded":
             self.root.ids.output_box.text = (
@@ -303,6 +394,10 @@ class WordSearchApp(App):
                 "> For more information, click the question mark icon on the top-right corner."
             )
 
+    def show_status(self, message):
+        # Called from background threads
+        Clock.schedule_once(lambda dt: setattr(self.root.ids.output_box, "text", message))
+
 
 if __name__ == '__main__':
     WordSearchApp().run()
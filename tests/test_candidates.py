@@ -0,0 +1,58 @@
+import numpy as np
+
+from assets.analysis import PROFICIENCY_SETTINGS, reclassify_book
+from assets.candidates import Candidates, load_candidates, load_candidates_level
+
+WORDS = ["obfuscate", "perspicacious", "ephemeral", "reading", "quixotic"]
+LOCAL = np.array([3, 80, 35, 200, 50], dtype=np.int64)
+GLOBAL = np.array([2e-7, 5e-8, 3e-6, 1e-3, 5e-6], dtype=np.float64)
+
+
+def saved_candidates(path, level="Medium"):
+    definitions = {word: f"definition of {word}" for word in WORDS}
+    Candidates("book", WORDS, LOCAL, GLOBAL, definitions, level).save(str(path))
+    return str(path)
+
+
+def test_save_and_load(tmp_path):
+    path = saved_candidates(tmp_path / "candidates.msgpack")
+    candidates = load_candidates(path)
+    assert candidates.words == WORDS
+    assert candidates.local_freq.tolist() == LOCAL.tolist()
+    assert candidates.global_freq.tolist() == GLOBAL.tolist()
+    assert candidates.level == "Medium"
+    assert load_candidates_level(path) == "Medium"
+
+
+def test_missing_or_invalid_file(tmp_path):
+    path = tmp_path / "candidates.msgpack"
+    assert load_candidates(str(path)) is None
+    assert load_candidates_level(str(path)) is None
+    path.write_bytes(b"not msgpack")
+    assert load_candidates(str(path)) is None
+    assert load_candidates_level(str(path)) is None
+
+
+def test_classify_levels():
+    candidates = Candidates("book", WORDS, LOCAL, GLOBAL)
+    for level, expected in [("Low", {0, 1, 2, 4}), ("Medium", {0, 1, 2}), ("High", {0, 1})]:
+        settings = PROFICIENCY_SETTINGS[level]
+        accepted, _ = candidates.classify(settings["local_limit"], settings["global_freq_limit"],
+                                          settings["common_word_lower_limit"])
+        assert set(accepted.tolist()) == expected, level
+
+
+def test_reclassify_saves_the_level(tmp_path):
+    path = saved_candidates(tmp_path / "candidates.msgpack")
+    definitions_path = tmp_path / "definitions.txt"
+
+    book_name, difficult_words = reclassify_book(path, PROFICIENCY_SETTINGS["High"], str(definitions_path),
+                                                 level="High")
+
+    assert book_name == "book"
+    assert list(difficult_words) == ["obfuscate", "perspicacious"]
+    assert definitions_path.read_text(encoding="utf-8").splitlines()[1:] == [
+        "obfuscate: definition of obfuscate", "perspicacious: definition of perspicacious"]
+    assert load_candidates_level(path) == "High"
+    # Nothing else is written next to the outputs, e.g. no common words file
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["candidates.msgpack", "definitions.txt"]
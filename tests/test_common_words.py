@@ -0,0 +1,41 @@
+import errno
+import os
+import sys
+import types
+
+import pytest
+
+from assets.common_words import file_lock
+
+
+def fake_msvcrt(failures):
+    """msvcrt stand-in whose locking() raises the given errnos before succeeding."""
+    failures = list(failures)
+
+    def locking(fd, mode, nbytes):
+        if mode == module.LK_LOCK and failures:
+            code = failures.pop(0)
+            raise OSError(code, os.strerror(code))
+
+    module = types.SimpleNamespace(LK_LOCK=1, LK_UNLCK=0, locking=locking)
+    return module, failures
+
+
+def test_windows_lock_waits_while_busy(tmp_path, monkeypatch):
+    module, failures = fake_msvcrt([errno.EDEADLK, errno.EACCES])
+    monkeypatch.setitem(sys.modules, "msvcrt", module)
+    with monkeypatch.context() as patch:
+        patch.setattr(os, "name", "nt")
+        with file_lock(str(tmp_path / "common_words.txt")):
+            pass
+    assert not failures
+
+
+def test_windows_lock_raises_other_errors(tmp_path, monkeypatch):
+    module, _ = fake_msvcrt([errno.EBADF])
+    monkeypatch.setitem(sys.modules, "msvcrt", module)
+    with pytest.raises(OSError) as raised, monkeypatch.context() as patch:
+        patch.setattr(os, "name", "nt")
+        with file_lock(str(tmp_path / "common_words.txt")):
+            pass
+    assert raised.value.errno == errno.EBADF
@@ -0,0 +1,48 @@
+import socket
+
+import nltk
+import pytest
+
+from assets.nltk_bootstrap import ensure_nltk_data
+
+RESOURCES = {"corpora/word_search_test": "word_search_test"}
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """No network, and NLTK's data path restored afterwards."""
+    def no_network(*args, **kwargs):
+        raise AssertionError("network access attempted")
+
+    monkeypatch.setattr(socket, "socket", no_network)
+    monkeypatch.setattr(socket, "create_connection", no_network)
+    monkeypatch.setattr(nltk, "download", no_network)
+    monkeypatch.setattr(nltk.data, "path", list(nltk.data.path))
+
+
+def test_copies_missing_data_from_mirror(offline, tmp_path):
+    mirror = tmp_path / "mirror"
+    (mirror / "corpora" / "word_search_test").mkdir(parents=True)
+    (mirror / "corpora" / "word_search_test" / "words.txt").write_text("obfuscate\n")
+    data_dir = tmp_path / "nltk_data"
+    messages = []
+
+    missing = ensure_nltk_data(str(data_dir), mirror=str(mirror), progress=messages.append,
+                               resources=RESOURCES)
+
+    assert missing == []
+    assert (data_dir / "corpora" / "word_search_test" / "words.txt").read_text() == "obfuscate\n"
+    assert nltk.data.find("corpora/word_search_test")
+    assert messages == [f"Copied NLTK data 'word_search_test' from {mirror}"]
+
+    # Found on disk the next time, so nothing is reported
+    messages.clear()
+    assert ensure_nltk_data(str(data_dir), mirror=str(mirror), progress=messages.append,
+                            resources=RESOURCES) == []
+    assert messages == []
+
+
+def test_reports_what_is_missing_without_network(offline, tmp_path):
+    missing = ensure_nltk_data(str(tmp_path / "nltk_data"), mirror=str(tmp_path / "empty"),
+                               allow_download=False, resources=RESOURCES)
+    assert missing == ["corpora/word_search_test"]
@@ -0,0 +1,116 @@
+from collections import Counter
+
+import nltk
+import pytest
+
+from assets import analysis
+from assets.analysis import PARALLEL_MIN_PAGES, get_difficult_word_frequencies, split_workers
+from assets.page_cache import PageCountCache, page_hash, pdf_file_key
+
+WORDS = ("obfuscate", "perspicacious", "well-known", "and/or", "don't", "U.S.", "o'clock",
+         "ephemeral", "quixotic", "the", "reading", "sesquipedalian", "laconic", "it's")
+
+
+def make_pages(count=PARALLEL_MIN_PAGES + 9):
+    # Every page mixes the words differently, so shard boundaries change the word order
+    return [" ".join(WORDS[(page * 7 + i * 3) % len(WORDS)] for i in range(40 + page)) + "."
+            for page in range(count)]
+
+
+def has_punkt():
+    try:
+        nltk.data.find("tokenizers/punkt_tab/english/")
+    except LookupError:
+        return False
+    return True
+
+
+def counted(pages, **kwargs):
+    word_frequency, _ = get_difficult_word_frequencies(pages, frozenset({"the"}), **kwargs)
+    return word_frequency.items()
+
+
+def tokenizers():
+    return ["regex", pytest.param("nltk", marks=pytest.mark.skipif(not has_punkt(), reason="Punkt data missing"))]
+
+
+@pytest.mark.parametrize("tokenizer", tokenizers())
+def test_parallel_counts_match_serial(spawn_workers, tokenizer):
+    pages = make_pages()
+    serial = counted(pages, tokenizer=tokenizer)
+    assert serial
+    assert counted(pages, workers=3, tokenizer=tokenizer) == serial
+
+
+@pytest.mark.parametrize("tokenizer", tokenizers())
+def test_parallel_cached_counts_match_serial(spawn_workers, tmp_path, tokenizer):
+    pages = make_pages()
+    serial = counted(pages, tokenizer=tokenizer)
+    page_cache = PageCountCache(str(tmp_path / "pages.db"))
+    try:
+        assert counted(pages, workers=3, tokenizer=tokenizer, page_cache=page_cache) == serial
+        # Second run reuses every page
+        assert counted(pages, workers=3, tokenizer=tokenizer, page_cache=page_cache) == serial
+    finally:
+        page_cache.close()
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_cached_repeated_pages_match_serial(spawn_workers, tmp_path, workers):
+    # Pages repeated within a shard and across shards still in flight
+    pages = make_pages()
+    pages = pages + pages[:20] + [pages[0]] * 5
+    serial = counted(pages, tokenizer="regex")
+    book = tmp_path / "book.pdf"
+    book.write_bytes(b"%PDF")
+    page_cache = PageCountCache(str(tmp_path / "pages.db"))
+    try:
+        kwargs = dict(workers=workers, tokenizer="regex", page_cache=page_cache, book_key=pdf_file_key(str(book)))
+        assert counted(pages, **kwargs) == serial
+        # The second run merges the stored counts without reading the pages
+        assert counted([], **kwargs) == serial
+    finally:
+        page_cache.close()
+
+
+def test_prune_drops_pages_of_changed_files(tmp_path):
+    book = tmp_path / "book.pdf"
+    book.write_bytes(b"%PDF")
+    old_key = pdf_file_key(str(book)) + "|regex"
+    page_cache = PageCountCache(str(tmp_path / "pages.db"))
+    try:
+        entries = {page_hash(text, "regex"): (Counter({text: 1}), 1) for text in ("kept", "dropped", "orphan")}
+        page_cache.store(entries)
+        kept, dropped, _ = entries
+        page_cache.store_book(old_key, [kept, dropped])
+        page_cache.prune()
+        assert page_cache.get_many(entries).keys() == {kept, dropped}
+
+        book.write_bytes(b"%PDF edited")
+        new_key = pdf_file_key(str(book)) + "|regex"
+        page_cache.store_book(new_key, [kept])
+        page_cache.prune()
+        assert page_cache.book_pages(old_key) is None
+        assert page_cache.get_many(entries).keys() == {kept}
+    finally:
+        page_cache.close()
+
+
+def _nltk_data_path():
+    return list(nltk.data.path)
+
+
+def test_workers_get_nltk_data_path(spawn_workers, tmp_path, monkeypatch):
+    bundled = str(tmp_path / "nltk_data")
+    monkeypatch.setattr(nltk.data, "path", [bundled] + nltk.data.path)
+    with analysis.worker_pool(1) as executor:
+        assert bundled in executor.submit(_nltk_data_path).result()
+
+
+@pytest.mark.parametrize("workers", range(1, 17))
+def test_split_workers_stays_within_budget(workers):
+    extract_workers, count_workers = split_workers(workers)
+    # One extraction worker means extracting in the calling process, which spawns nothing
+    spawned = (extract_workers if extract_workers > 1 else 0) + count_workers
+    assert spawned <= workers
+    assert count_workers >= extract_workers
@@ -0,0 +1,33 @@
+import multiprocessing
+
+import fitz
+
+from assets.analysis import PARALLEL_EXTRACT_MIN_PAGES, extract_pdf_pages, iter_pdf_pages
+
+
+def make_pdf(path, pages=PARALLEL_EXTRACT_MIN_PAGES + 5):
+    doc = fitz.open()
+    for number in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page {number} mentions word{number} once.")
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def test_parallel_extraction_matches_serial(spawn_workers, tmp_path):
+    path = make_pdf(tmp_path / "book.pdf")
+    serial = extract_pdf_pages(path)
+    assert len(serial) == PARALLEL_EXTRACT_MIN_PAGES + 5
+    assert all(f"word{number}" in text for number, text in enumerate(serial))
+    assert extract_pdf_pages(path, workers=3) == serial
+
+
+def test_closing_parallel_extraction_stops_workers(spawn_workers, tmp_path):
+    path = make_pdf(tmp_path / "book.pdf")
+    before = set(multiprocessing.active_children())
+    pages = iter_pdf_pages(path, workers=3)
+    assert "word0" in next(pages)
+    assert set(multiprocessing.active_children()) - before
+    pages.close()
+    # Leaving the pool joins its workers
+    assert set(multiprocessing.active_children()) <= before
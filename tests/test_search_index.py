@@ -0,0 +1,59 @@
+import difflib
+import threading
+
+from assets.search_index import FuzzyIndex
+
+WORDS = ["perspicacious", "perspective", "obfuscate", "obfuscation", "ephemeral", "ephemera",
+         "quixotic", "laconic", "sesquipedalian", "recalcitrant", "recalculate", "ubiquitous"]
+TYPOS = ["perspicacous", "obfsucate", "ephemerl", "quixtoic", "lacnic", "recalcitrnt", "ubiqutous"]
+
+# Long words spelled by sound, three or more edits away, with look-alikes to rank against
+LONG_WORDS = WORDS + ["perspicuous", "epicanthus", "obsequious", "obstreperous", "sesquicentennial",
+                      "recalcitrance", "ubiquity", "pusillanimous", "pusillanimity", "onomatopoeia",
+                      "onomastic", "idiosyncrasy", "idiosyncratic", "conscientious", "consciousness"]
+SOUND_SPELLINGS = {
+    "perspicashus": "perspicacious",
+    "obstroperus": "obstreperous",
+    "pusilanimus": "pusillanimous",
+    "onomatopia": "onomatopoeia",
+    "idiosincracy": "idiosyncrasy",
+    "consientshus": "conscientious",
+    "sesquipedelion": "sesquipedalian",
+    "ubikwitus": "ubiquitous",
+    "rekalsitrant": "recalcitrant",
+    "efemeral": "ephemeral",
+}
+
+
+def test_suggestions_find_the_intended_word():
+    fuzzy_index = FuzzyIndex(WORDS)
+    for typo in TYPOS:
+        assert fuzzy_index.suggest(typo, n=1) == difflib.get_close_matches(typo, WORDS, n=1)
+
+
+def test_multi_edit_misspellings_rank_like_difflib():
+    fuzzy_index = FuzzyIndex(LONG_WORDS)
+    for typo, intended in SOUND_SPELLINGS.items():
+        suggestions = fuzzy_index.suggest(typo, n=3)
+        assert intended in suggestions, typo
+        assert suggestions == difflib.get_close_matches(typo, LONG_WORDS, n=3), typo
+
+
+def test_update_matches_a_fresh_index():
+    fuzzy_index = FuzzyIndex(WORDS)
+    words = WORDS[3:] + ["perspicuous", "obfuscator"]
+    fuzzy_index.update(words)
+    fresh = FuzzyIndex(words)
+    for typo in TYPOS + ["perspicous", "obfuscatr"]:
+        assert fuzzy_index.suggest(typo) == fresh.suggest(typo)
+
+
+def test_suggest_does_not_wait_for_an_update():
+    fuzzy_index = FuzzyIndex(WORDS)
+    # Hold the update lock so the background update cannot finish
+    with fuzzy_index._lock:
+        fuzzy_index.update_async(WORDS + ["ubiquity"])
+        assert fuzzy_index.suggest("ubiquty") is None
+    while not fuzzy_index.ready:
+        threading.Event().wait(0.01)
+    assert fuzzy_index.suggest("ubiquty", n=1) == ["ubiquity"]
@@ -0,0 +1,76 @@
+from collections import Counter
+
+import nltk
+import pytest
+from nltk.tokenize import word_tokenize
+
+from assets.analysis import normalize_token
+from assets.common_words import DEFAULT_COMMON_WORDS
+from assets.tokenizers import regex_tokenize
+
+# One sentence per entry, so NLTK's reference tokens can be produced without
+# the Punkt data: Punkt would split the joined text at these boundaries
+SENTENCES = [
+    "The well-known author wrote a thought-provoking, self-referential novel.",
+    "Readers and/or critics called its input/output metaphors half-baked.",
+    "She moved to the U.S. in 1999, e.g. to study at Dr. Smith's lab.",
+    "Isn't it odd that they'd've left at five o'clock?",
+    "We're sure you'll find the sesquipedalian prose (and its footnotes) tiresome...",
+    "\"Don't,\" he said; the laconic reply was Rock 'n' roll.",
+    "The ne'er-do-well's cousins' obfuscation cost $3.50 per copy -- a bargain.",
+    "Mr. O'Neill couldn't read page 3.14, nor pages 12-15 of vol. II.",
+    "Their perspicacious editor wasn't convinced; she'd seen worse.",
+    "Its ephemeral fame faded: by 2020 nobody remembered the quixotic hero.",
+]
+TEXT = "\n".join(SENTENCES)
+
+# Share of candidate word occurrences allowed to differ from NLTK. On TEXT the two
+# known differences are "they'd've" and "'n'", which NLTK splits differently
+MAX_DIVERGENCE = 0.02
+
+
+def candidate_counts(tokens):
+    words = (normalize_token(token) for token in tokens)
+    return Counter(word for word in words if word and word not in DEFAULT_COMMON_WORDS)
+
+
+def divergence(reference, other):
+    total = sum(reference.values())
+    changed = sum(((reference - other) + (other - reference)).values())
+    return changed / (2 * total)
+
+
+def nltk_reference():
+    return [token for sentence in SENTENCES for token in word_tokenize(sentence, preserve_line=True)]
+
+
+def test_regex_matches_nltk_on_candidate_words():
+    reference = candidate_counts(nltk_reference())
+    assert sum(reference.values()) > 30
+    assert divergence(reference, candidate_counts(regex_tokenize(TEXT))) <= MAX_DIVERGENCE
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("well-known thought-provoking", ["well-known", "thought-provoking"]),
+    ("and/or input/output", ["and/or", "input/output"]),
+    ("the U.S. army", ["the", "U.S", "army"]),
+    ("don't isn't they'd've", ["do", "n't", "is", "n't", "they", "'d", "'ve"]),
+    ("o'clock O'Neill", ["o'clock", "O'Neill"]),
+    ("Smith's cousins'", ["Smith", "'s", "cousins"]),
+])
+def test_regex_splits_like_nltk(text, expected):
+    assert regex_tokenize(text) == expected
+
+
+def has_punkt():
+    try:
+        nltk.data.find("tokenizers/punkt_tab/english/")
+    except LookupError:
+        return False
+    return True
+
+
+@pytest.mark.skipif(not has_punkt(), reason="Punkt data missing")
+def test_regex_matches_full_word_tokenize():
+    reference = candidate_counts(word_tokenize(TEXT))
+    assert divergence(reference, candidate_counts(regex_tokenize(TEXT))) <= MAX_DIVERGENCE